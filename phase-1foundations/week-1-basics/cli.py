@@ -0,0 +1,145 @@
+"""
+Week 1: Single CLI for the prompt/parser techniques
+Learning: Run (or benchmark) one technique without paying for the others -
+modules build their LLMs, parsers and chains only when a technique needs them
+
+Usage:
+    python cli.py list
+    python cli.py fewshot format
+    python cli.py advanced role --inputs my_roles.jsonl --max-concurrency 2
+    python cli.py import-times
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DAY1_DIR = os.path.join(HERE, "day1-2-first-chain")
+DAY3_DIR = os.path.join(HERE, "day3-4-prompts-parsers")
+
+# subcommand -> (module, directory)
+GROUPS = {
+    "components": ("components_explained", DAY1_DIR),
+    "advanced": ("advanced_prompts", DAY3_DIR),
+    "fewshot": ("fewshot_prompting", DAY3_DIR),
+    "structured": ("structured_outputs", DAY3_DIR),
+}
+
+# Importing a technique module must not build LLMs/chains or import langchain.
+# Pydantic schemas are still defined at import time (~200ms for the modules
+# that have them), which is what the budget leaves room for.
+IMPORT_BUDGET_SECONDS = 0.3
+
+
+def load_group(group: str):
+    module_name, directory = GROUPS[group]
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    return importlib.import_module(module_name)
+
+
+def read_inputs(path: str) -> List[Dict[str, Any]]:
+    """A JSON object, a JSON list of objects, or JSON lines"""
+    with open(path) as f:
+        text = f.read()
+    if path.endswith(".jsonl"):
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    data = json.loads(text)
+    return data if isinstance(data, list) else [data]
+
+
+def _printable(result: Any) -> str:
+    if hasattr(result, "model_dump_json"):
+        return result.model_dump_json(indent=2)
+    if isinstance(result, (dict, list)):
+        return json.dumps(result, indent=2)
+    return str(result)
+
+
+def run_technique(group: str, name: str, inputs: List[Dict[str, Any]] = None,
+                  max_concurrency: int = 4) -> List[Any]:
+    """Run one technique over its sample inputs (or ``inputs``)"""
+    module = load_group(group)
+    if name not in module.TECHNIQUES:
+        raise SystemExit(f"Unknown {group} technique {name!r}; choose from: {', '.join(module.TECHNIQUES)}")
+    technique = module.TECHNIQUES[name]
+    inputs = inputs or technique["inputs"]
+    if "function" in technique:
+        return [technique["function"](item) for item in inputs]
+    chain = getattr(module, technique["chain"])  # built on first access
+    return chain.batch(inputs, config={"max_concurrency": max_concurrency}, return_exceptions=True)
+
+
+def import_times() -> Dict[str, Any]:
+    """Import each technique module in a fresh interpreter and time it.
+
+    Maps module -> seconds, or -> the error line when the import failed.
+    """
+    times = {}
+    for group, (module_name, directory) in GROUPS.items():
+        code = ("import sys, time; sys.path.insert(0, sys.argv[1]); start = time.perf_counter(); "
+                f"import {module_name}; print(time.perf_counter() - start)")
+        out = subprocess.run([sys.executable, "-c", code, directory], cwd=directory,
+                             capture_output=True, text=True)
+        if out.returncode:
+            times[module_name] = out.stderr.strip().splitlines()[-1]
+        else:
+            times[module_name] = float(out.stdout.strip())
+    return times
+
+
+def main(argv: List[str] = None) -> int:
+    cli = argparse.ArgumentParser(description="Week 1 prompt & parser techniques")
+    sub = cli.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list every technique")
+    times = sub.add_parser("import-times", help="check module import time against the budget")
+    times.add_argument("--budget", type=float, default=IMPORT_BUDGET_SECONDS)
+
+    for group, (module_name, _) in GROUPS.items():
+        command = sub.add_parser(group, help=f"run a technique from {module_name}.py")
+        command.add_argument("technique", help="technique name (see `cli.py list`)")
+        command.add_argument("--inputs", help="JSON / JSON lines file with one input dict per run")
+        command.add_argument("--max-concurrency", type=int, default=4)
+
+    args = cli.parse_args(argv)
+
+    if args.command == "list":
+        for group in GROUPS:
+            module = load_group(group)
+            for name, technique in module.TECHNIQUES.items():
+                variables = ", ".join(technique["inputs"][0])
+                print(f"{group:<11} {name:<16} {technique['title']}  [{variables}]")
+        return 0
+
+    if args.command == "import-times":
+        status = 0
+        for module_name, seconds in import_times().items():
+            if isinstance(seconds, str):
+                status = 1
+                print(f"❌ {module_name:<22} import failed: {seconds}")
+                continue
+            ok = seconds <= args.budget
+            status |= not ok
+            print(f"{'✅' if ok else '❌'} {module_name:<22} {seconds * 1000:7.1f}ms (budget {args.budget * 1000:.0f}ms)")
+        return status
+
+    inputs = read_inputs(args.inputs) if args.inputs else None
+    start = time.perf_counter()
+    results = run_technique(args.command, args.technique, inputs, args.max_concurrency)
+    for i, result in enumerate(results, 1):
+        if isinstance(result, Exception):
+            print(f"[{i}] ❌ {type(result).__name__}: {result}\n")
+        else:
+            print(f"[{i}] {_printable(result)}\n")
+    print(f"{len(results)} run(s) in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,35 +50,36 @@ test_questions = [
     }
 ]
 
-print("=== Banking Domain Q&A Assistant ===\n")
-for i, qa in enumerate(test_questions, 1):
-    print(f"Question {i}: {qa['question']}")
-    print(f"Context: {qa['context']}")
+if __name__ == "__main__":
+    print("=== Banking Domain Q&A Assistant ===\n")
+    for i, qa in enumerate(test_questions, 1):
+        print(f"Question {i}: {qa['question']}")
+        print(f"Context: {qa['context']}")
     
-    response = banking_chain.invoke({
-        "question": qa['question'],
-        "context": qa['context']
-    })
+        response = banking_chain.invoke({
+            "question": qa['question'],
+            "context": qa['context']
+        })
     
-    print(f"\nAnswer:\n{response}")
-    print("\n" + "="*100 + "\n")
+        print(f"\nAnswer:\n{response}")
+        print("\n" + "="*100 + "\n")
 
-# Interactive mode (optional)
-print("=== Interactive Mode ===")
-print("Enter your banking/payments questions (type 'exit' to quit)")
+    # Interactive mode (optional)
+    print("=== Interactive Mode ===")
+    print("Enter your banking/payments questions (type 'exit' to quit)")
 
-while True:
-    user_question = input("\nYour question: ")
-    if user_question.lower() == 'exit':
-        break
+    while True:
+        user_question = input("\nYour question: ")
+        if user_question.lower() == 'exit':
+            break
     
-    context = input("Context (press Enter for general): ")
-    if not context:
-        context = "General banking and payments domain"
+        context = input("Context (press Enter for general): ")
+        if not context:
+            context = "General banking and payments domain"
     
-    answer = banking_chain.invoke({
-        "question": user_question,
-        "context": context
-    })
+        answer = banking_chain.invoke({
+            "question": user_question,
+            "context": context
+        })
     
-    print(f"\nAnswer: {answer}\n")
+        print(f"\nAnswer: {answer}\n")
@@ -13,11 +13,6 @@ llm = OllamaLLM(
     temperature=0.7,
 )
 
-# Test basic LLM call
-print("=== Testing Basic LLM Call ===")
-response = llm.invoke("Explain what LangChain is in one sentence.")
-print(f"Response: {response}\n")
-
 # Create a prompt template
 prompt = PromptTemplate(
     input_variables=["topic"],
@@ -27,11 +22,6 @@ prompt = PromptTemplate(
 # Build a chain using LCEL (LangChain Expression Language)
 chain = prompt | llm | StrOutputParser()
 
-# Execute the chain
-print("=== Testing Chain with Prompt Template ===")
-result = chain.invoke({"topic": "Retrieval Augmented Generation (RAG)"})
-print(f"Result: {result}\n")
-
 # Multiple invocations with different topics
 topics = [
     "Large Language Models",
@@ -39,9 +29,20 @@ topics = [
     "Prompt Engineering"
 ]
 
-print("=== Testing Multiple Invocations ===")
-for topic in topics:
-    result = chain.invoke({"topic": topic})
-    print(f"\nTopic: {topic}")
-    print(f"Explanation: {result}")
-    print("-" * 80)
+if __name__ == "__main__":
+    # Test basic LLM call
+    print("=== Testing Basic LLM Call ===")
+    response = llm.invoke("Explain what LangChain is in one sentence.")
+    print(f"Response: {response}\n")
+
+    # Execute the chain
+    print("=== Testing Chain with Prompt Template ===")
+    result = chain.invoke({"topic": "Retrieval Augmented Generation (RAG)"})
+    print(f"Result: {result}\n")
+
+    print("=== Testing Multiple Invocations ===")
+    for topic in topics:
+        result = chain.invoke({"topic": topic})
+        print(f"\nTopic: {topic}")
+        print(f"Explanation: {result}")
+        print("-" * 80)
@@ -0,0 +1,102 @@
+"""
+Day 1-2: LCEL Overhead & Compiled Chains
+Learning: Measure what the Runnable machinery (config merging, callback
+managers, per-step copies) costs per call, and fuse a static
+prompt | llm | StrOutputParser chain into one direct call
+"""
+
+import time
+from typing import Any, Callable, Dict, List
+
+from langchain_core.language_models import BaseLLM
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableSequence
+
+
+class CompiledChain:
+    """prompt | llm | StrOutputParser fused into a direct call.
+
+    Takes the same input dict and returns the same string as the LCEL
+    chain, but skips config merging and callback managers - so callbacks,
+    tracing and ``config`` options do not apply on this path.
+    """
+
+    def __init__(self, prompt: PromptTemplate, llm: BaseLLM):
+        self.template = prompt.template
+        self.partial_variables = prompt.partial_variables
+        self.llm = llm
+
+    def invoke(self, inputs: Dict[str, Any]) -> str:
+        partials = {k: v() if callable(v) else v for k, v in self.partial_variables.items()}
+        # An input named like a partial overrides it, as in PromptTemplate
+        text = self.template.format(**{**partials, **inputs})
+        return self.llm._generate([text]).generations[0][0].text
+
+    def batch(self, inputs: List[Dict[str, Any]]) -> List[str]:
+        return [self.invoke(i) for i in inputs]
+
+
+def compile_chain(chain: RunnableSequence) -> CompiledChain:
+    """Compile a static ``PromptTemplate | BaseLLM | StrOutputParser`` chain"""
+    steps = chain.steps
+    if not (
+        len(steps) == 3
+        and isinstance(steps[0], PromptTemplate)
+        and steps[0].template_format == "f-string"
+        and isinstance(steps[1], BaseLLM)
+        and isinstance(steps[2], StrOutputParser)
+    ):
+        raise ValueError("Only f-string PromptTemplate | LLM | StrOutputParser chains can be compiled")
+    return CompiledChain(steps[0], steps[1])
+
+
+# ============================================================================
+# Benchmark with a no-op LLM
+# ============================================================================
+
+BENCH_CALLS = 20_000
+
+
+def per_call_us(fn: Callable[[], Any], calls: int = BENCH_CALLS) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+if __name__ == "__main__":
+    from first_chain import prompt
+
+    noop_llm = FakeListLLM(responses=["ok"])
+    parser = StrOutputParser()
+    chain = prompt | noop_llm | parser
+    compiled = compile_chain(chain)
+    inputs = {"topic": "Vector Databases"}
+    text = prompt.format(**inputs)
+
+    assert compiled.invoke(inputs) == chain.invoke(inputs)
+
+    print(f"=== LCEL OVERHEAD ({BENCH_CALLS:,} calls, no-op LLM) ===\n")
+    raw = {
+        "prompt": per_call_us(lambda: prompt.template.format(**inputs)),
+        "llm": per_call_us(lambda: noop_llm._call(text)),
+        "parser": per_call_us(lambda: parser.parse("ok")),
+    }
+    runnable = {
+        "prompt": per_call_us(lambda: prompt.invoke(inputs)),
+        "llm": per_call_us(lambda: noop_llm.invoke(text)),
+        "parser": per_call_us(lambda: parser.invoke("ok")),
+    }
+    print(f"{'Step':<10} {'Direct':>10} {'.invoke()':>12} {'Overhead':>10}")
+    for step in raw:
+        print(f"{step:<10} {raw[step]:>8.1f}us {runnable[step]:>10.1f}us {runnable[step] - raw[step]:>8.1f}us")
+    print()
+
+    lcel_us = per_call_us(lambda: chain.invoke(inputs))
+    compiled_us = per_call_us(lambda: compiled.invoke(inputs))
+    print(f"LCEL chain.invoke:      {lcel_us:>8.1f}us per call ({1e6 / lcel_us:>8,.0f} calls/s)")
+    print(f"Compiled chain.invoke:  {compiled_us:>8.1f}us per call ({1e6 / compiled_us:>8,.0f} calls/s)")
+    print(f"Speedup:                {lcel_us / compiled_us:>8.1f}x")
+    print("\n" + "="*100 + "\n")
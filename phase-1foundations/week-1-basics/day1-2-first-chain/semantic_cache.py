@@ -0,0 +1,202 @@
+"""
+Day 1-2: Semantic Answer Cache
+Learning: Reuse answers for questions that mean the same thing even when
+worded differently, using local embeddings and cosine similarity
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_ollama import OllamaEmbeddings
+
+from day1_exercise import banking_chain, test_questions
+
+
+class SemanticCache:
+    """In-memory vector index of (question + context) -> answer.
+
+    Vectors are L2-normalised rows of one float32 matrix, so a lookup is a
+    single matrix-vector product. Entries expire after their TTL and the
+    least recently used entry is evicted when the cache is full.
+    """
+
+    def __init__(
+        self,
+        embeddings=None,
+        threshold: float = 0.90,
+        max_entries: int = 1000,
+        default_ttl_seconds: Optional[float] = 24 * 3600,
+        persist_path: Optional[str] = None,
+    ):
+        self.embeddings = embeddings or OllamaEmbeddings(model="nomic-embed-text")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.persist_path = persist_path
+
+        self._vectors: Optional[np.ndarray] = None  # (capacity, dim) float32
+        self._entries: List[Optional[Dict]] = []    # slot -> entry (None = free)
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "false_hits": 0,
+                      "evictions": 0, "expired": 0}
+        if persist_path and os.path.exists(persist_path + ".json"):
+            self.load()
+
+    # ------------------------------------------------------------------
+    # Embedding + search
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cache_text(question: str, context: str) -> str:
+        return f"Question: {question}\nContext: {context}"
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _search(self, vector: np.ndarray):
+        """(slot, cosine) of the best live entry, or (None, 0.0)"""
+        if self._vectors is None or not any(self._entries):
+            return None, 0.0
+        scores = self._vectors[:len(self._entries)] @ vector
+        now = time.time()
+        for slot, entry in enumerate(self._entries):
+            if entry is None:
+                scores[slot] = -1.0
+            elif entry["expires_at"] is not None and entry["expires_at"] < now:
+                self._free(slot)
+                self.stats["expired"] += 1
+                scores[slot] = -1.0
+        slot = int(np.argmax(scores))
+        return (slot, float(scores[slot])) if scores[slot] >= 0 else (None, 0.0)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def lookup(self, question: str, context: str) -> Optional[Dict]:
+        """Cached entry above the cosine threshold, or None"""
+        self.stats["lookups"] += 1
+        slot, score = self._search(self._embed(self.cache_text(question, context)))
+        if slot is None or score < self.threshold:
+            self.stats["misses"] += 1
+            return None
+        entry = self._entries[slot]
+        entry["last_used"] = time.time()
+        entry["hits"] += 1
+        self.stats["hits"] += 1
+        return {**entry, "score": score}
+
+    def put(self, question: str, context: str, answer: str, ttl_seconds: Optional[float] = None) -> None:
+        vector = self._embed(self.cache_text(question, context))
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        now = time.time()
+        entry = {"question": question, "context": context, "answer": answer,
+                 "created_at": now, "last_used": now, "hits": 0,
+                 "expires_at": now + ttl if ttl else None}
+        slot = self._allocate(len(vector))
+        self._vectors[slot] = vector
+        self._entries[slot] = entry
+
+    def report_false_hit(self) -> None:
+        """Call when a cached answer turned out not to fit the question"""
+        self.stats["false_hits"] += 1
+
+    def report(self) -> Dict[str, float]:
+        lookups = self.stats["lookups"] or 1
+        hits = self.stats["hits"] or 1
+        return {
+            **self.stats,
+            "entries": sum(e is not None for e in self._entries),
+            "hit_rate": self.stats["hits"] / lookups,
+            "false_hit_rate": self.stats["false_hits"] / hits,
+        }
+
+    # ------------------------------------------------------------------
+    # Slots, eviction, persistence
+    # ------------------------------------------------------------------
+
+    def _free(self, slot: int) -> None:
+        self._entries[slot] = None
+
+    def _allocate(self, dim: int) -> int:
+        if self._vectors is None:
+            self._vectors = np.zeros((min(self.max_entries, 64), dim), dtype=np.float32)
+        for slot, entry in enumerate(self._entries):
+            if entry is None:
+                return slot
+        if len(self._entries) >= self.max_entries:
+            # Full: evict the least recently used entry
+            slot = min(range(len(self._entries)), key=lambda s: self._entries[s]["last_used"])
+            self.stats["evictions"] += 1
+            return slot
+        if len(self._entries) == len(self._vectors):
+            grown = np.zeros((min(len(self._vectors) * 2, self.max_entries), dim), dtype=np.float32)
+            grown[:len(self._vectors)] = self._vectors
+            self._vectors = grown
+        self._entries.append(None)
+        return len(self._entries) - 1
+
+    def save(self) -> None:
+        if not self.persist_path or self._vectors is None:
+            return
+        np.save(self.persist_path + ".npy", self._vectors[:len(self._entries)])
+        with open(self.persist_path + ".json", "w") as f:
+            json.dump(self._entries, f)
+
+    def load(self) -> None:
+        with open(self.persist_path + ".json") as f:
+            self._entries = json.load(f)
+        vectors = np.load(self.persist_path + ".npy")
+        self._vectors = np.zeros((max(len(vectors), min(self.max_entries, 64)), vectors.shape[1]),
+                                 dtype=np.float32)
+        self._vectors[:len(vectors)] = vectors
+
+
+def cached_ask(cache: SemanticCache, question: str, context: str) -> Dict:
+    """Answer from the cache when a similar question was seen, else ask the LLM"""
+    start = time.perf_counter()
+    hit = cache.lookup(question, context)
+    if hit is not None:
+        return {"answer": hit["answer"], "cached": True, "matched": hit["question"],
+                "score": hit["score"], "seconds": time.perf_counter() - start}
+    answer = banking_chain.invoke({"question": question, "context": context})
+    cache.put(question, context, answer)
+    return {"answer": answer, "cached": False, "seconds": time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    cache = SemanticCache(threshold=0.90, persist_path="banking_semantic_cache")
+
+    # Rewordings of the test questions (should hit) and new intents (should miss)
+    paraphrases = [
+        ("How do we prioritize SLA-breach incidents?", test_questions[1], True),
+        ("Prioritizing incidents that breach SLA", test_questions[1], True),
+        ("What happens when a client interaction fails in payment processing?", test_questions[0], True),
+        ("Main building blocks of a real-time payments platform?", test_questions[2], True),
+        ("How should we prioritize feature requests from clients?", test_questions[1], False),
+        ("What is the impact of a failed batch settlement job?", test_questions[0], False),
+    ]
+
+    print("=== SEMANTIC CACHE: WARM-UP ===\n")
+    for qa in test_questions:
+        result = cached_ask(cache, qa["question"], qa["context"])
+        print(f"{'HIT ' if result['cached'] else 'MISS'} {result['seconds']:6.2f}s  {qa['question']}")
+
+    print("\n=== SEMANTIC CACHE: REWORDED QUESTIONS ===\n")
+    for question, source, same_intent in paraphrases:
+        result = cached_ask(cache, question, source["context"])
+        if result["cached"] and not same_intent:
+            cache.report_false_hit()
+        label = "HIT " if result["cached"] else "MISS"
+        print(f"{label} {result['seconds']:6.2f}s  {question}")
+        if result["cached"]:
+            print(f"      matched ({result['score']:.3f}): {result['matched']}")
+
+    cache.save()
+    report = cache.report()
+    print(f"\nHit rate: {report['hit_rate']:.0%} | false-hit rate: {report['false_hit_rate']:.0%} | "
+          f"entries: {report['entries']} | evictions: {report['evictions']} | expired: {report['expired']}")
+    print("\n" + "="*100 + "\n")
@@ -1,22 +1,37 @@
 """
 Day 3-4: Advanced Prompt Engineering
 Learning: Multiple variables, roles, context, and systematic instructions
+
+The LLM, prompts and chains are built on first use (see lazy_registry.py),
+so importing this module stays cheap. Run one technique with
+``python ../cli.py advanced <technique>``.
 """
 
-from langchain_ollama import OllamaLLM
-from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from lazy_registry import LazyRegistry
+
+lazy = LazyRegistry(__name__)
+__getattr__ = lazy.module_getattr
+
+
+@lazy
+def _llm():
+    from langchain_ollama import OllamaLLM
+    return OllamaLLM(model="command-r", temperature=0.7)
 
-llm = OllamaLLM(model="command-r", temperature=0.7)
+
+def _str_chain(prompt):
+    from langchain_core.output_parsers import StrOutputParser
+    return prompt | lazy.llm | StrOutputParser()
 
 # ============================================================================
 # TECHNIQUE 1: Role-Based Prompting
 # ============================================================================
-print("=== TECHNIQUE 1: ROLE-BASED PROMPTING ===\n")
-
-role_prompt = PromptTemplate(
-    input_variables=["role", "task", "domain"],
-    template="""You are a {role} with 15 years of experience in {domain}.
+@lazy
+def _role_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["role", "task", "domain"],
+        template="""You are a {role} with 15 years of experience in {domain}.
 
 Task: {task}
 
@@ -24,26 +39,28 @@ Provide a comprehensive, expert-level response using industry terminology.
 Format your response with clear sections and bullet points where appropriate.
 
 Response:"""
-)
+    )
 
 # Test with banking domain
-chain = role_prompt | llm | StrOutputParser()
-result = chain.invoke({
+@lazy
+def _chain():
+    return _str_chain(lazy.role_prompt)
+
+role_inputs = {
     "role": "Senior Production Support Engineer",
     "domain": "banking payments and transaction processing",
     "task": "Explain the incident management workflow for a critical payment processing failure affecting 1000+ transactions"
-})
-print(f"Role-based response:\n{result}\n")
-print("="*100 + "\n")
+}
 
 # ============================================================================
 # TECHNIQUE 2: Context + Constraints
 # ============================================================================
-print("=== TECHNIQUE 2: CONTEXT + CONSTRAINTS ===\n")
-
-constrained_prompt = PromptTemplate(
-    input_variables=["context", "question", "max_words", "tone"],
-    template="""Context: {context}
+@lazy
+def _constrained_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["context", "question", "max_words", "tone"],
+        template="""Context: {context}
 
 Question: {question}
 
@@ -54,26 +71,28 @@ Constraints:
 - Use bullet points for key points
 
 Answer:"""
-)
+    )
 
-chain2 = constrained_prompt | llm | StrOutputParser()
-result2 = chain2.invoke({
+@lazy
+def _chain2():
+    return _str_chain(lazy.constrained_prompt)
+
+constrained_inputs = {
     "context": "A wholesale banking platform processing $5B daily in international payments",
     "question": "What metrics should we monitor to predict payment processing failures?",
     "max_words": "150",
     "tone": "technical and precise"
-})
-print(f"Constrained response:\n{result2}\n")
-print("="*100 + "\n")
+}
 
 # ============================================================================
 # TECHNIQUE 3: Multi-Step Instructions
 # ============================================================================
-print("=== TECHNIQUE 3: MULTI-STEP INSTRUCTIONS ===\n")
-
-multistep_prompt = PromptTemplate(
-    input_variables=["scenario", "requirement"],
-    template="""Scenario: {scenario}
+@lazy
+def _multistep_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["scenario", "requirement"],
+        template="""Scenario: {scenario}
 
 Requirement: {requirement}
 
@@ -86,24 +105,26 @@ Follow these steps in your response:
 Use clear headers for each step.
 
 Analysis:"""
-)
+    )
 
-chain3 = multistep_prompt | llm | StrOutputParser()
-result3 = chain3.invoke({
+@lazy
+def _chain3():
+    return _str_chain(lazy.multistep_prompt)
+
+multistep_inputs = {
     "scenario": "Production incident: Payment API latency increased from 200ms to 5000ms affecting all customer transactions",
     "requirement": "Develop an immediate action plan and long-term prevention strategy"
-})
-print(f"Multi-step response:\n{result3}\n")
-print("="*100 + "\n")
+}
 
 # ============================================================================
 # TECHNIQUE 4: Comparison Prompts
 # ============================================================================
-print("=== TECHNIQUE 4: COMPARISON PROMPTS ===\n")
-
-comparison_prompt = PromptTemplate(
-    input_variables=["option_a", "option_b", "criteria"],
-    template="""Compare the following two approaches based on: {criteria}
+@lazy
+def _comparison_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["option_a", "option_b", "criteria"],
+        template="""Compare the following two approaches based on: {criteria}
 
 Option A: {option_a}
 
@@ -115,25 +136,27 @@ Provide a structured comparison:
 3. Your recommendation with justification
 
 Comparison:"""
-)
+    )
 
-chain4 = comparison_prompt | llm | StrOutputParser()
-result4 = chain4.invoke({
+@lazy
+def _chain4():
+    return _str_chain(lazy.comparison_prompt)
+
+comparison_inputs = {
     "option_a": "Monolithic architecture for payment processing",
     "option_b": "Microservices architecture for payment processing",
     "criteria": "scalability, reliability, maintenance complexity, and incident response"
-})
-print(f"Comparison response:\n{result4}\n")
-print("="*100 + "\n")
+}
 
 # ============================================================================
 # TECHNIQUE 5: Template with Examples (Inline Few-Shot)
 # ============================================================================
-print("=== TECHNIQUE 5: INLINE FEW-SHOT EXAMPLES ===\n")
-
-fewshot_inline_prompt = PromptTemplate(
-    input_variables=["incident"],
-    template="""You are an incident severity classifier for banking systems.
+@lazy
+def _fewshot_inline_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["incident"],
+        template="""You are an incident severity classifier for banking systems.
 
 Examples:
 Incident: "Database connection pool exhausted, 50% of API requests failing"
@@ -151,11 +174,49 @@ Action: Assign to security team, set reminder
 Now classify:
 Incident: {incident}
 Severity:"""
-)
+    )
+
+@lazy
+def _chain5():
+    return _str_chain(lazy.fewshot_inline_prompt)
 
-chain5 = fewshot_inline_prompt | llm | StrOutputParser()
-result5 = chain5.invoke({
+fewshot_inline_inputs = {
     "incident": "Payment reconciliation system showing 0.5% discrepancy in transaction amounts"
-})
-print(f"Few-shot classification:\n{result5}\n")
-print("="*100 + "\n")
+}
+
+# Techniques runnable through ../cli.py
+TECHNIQUES = {
+    "role": {"title": "TECHNIQUE 1: ROLE-BASED PROMPTING", "chain": "chain", "inputs": [role_inputs]},
+    "constraints": {"title": "TECHNIQUE 2: CONTEXT + CONSTRAINTS", "chain": "chain2", "inputs": [constrained_inputs]},
+    "multistep": {"title": "TECHNIQUE 3: MULTI-STEP INSTRUCTIONS", "chain": "chain3", "inputs": [multistep_inputs]},
+    "comparison": {"title": "TECHNIQUE 4: COMPARISON PROMPTS", "chain": "chain4", "inputs": [comparison_inputs]},
+    "fewshot-inline": {"title": "TECHNIQUE 5: INLINE FEW-SHOT EXAMPLES", "chain": "chain5",
+                       "inputs": [fewshot_inline_inputs]},
+}
+
+
+if __name__ == "__main__":
+    print("=== TECHNIQUE 1: ROLE-BASED PROMPTING ===\n")
+    result = lazy.chain.invoke(role_inputs)
+    print(f"Role-based response:\n{result}\n")
+    print("="*100 + "\n")
+
+    print("=== TECHNIQUE 2: CONTEXT + CONSTRAINTS ===\n")
+    result2 = lazy.chain2.invoke(constrained_inputs)
+    print(f"Constrained response:\n{result2}\n")
+    print("="*100 + "\n")
+
+    print("=== TECHNIQUE 3: MULTI-STEP INSTRUCTIONS ===\n")
+    result3 = lazy.chain3.invoke(multistep_inputs)
+    print(f"Multi-step response:\n{result3}\n")
+    print("="*100 + "\n")
+
+    print("=== TECHNIQUE 4: COMPARISON PROMPTS ===\n")
+    result4 = lazy.chain4.invoke(comparison_inputs)
+    print(f"Comparison response:\n{result4}\n")
+    print("="*100 + "\n")
+
+    print("=== TECHNIQUE 5: INLINE FEW-SHOT EXAMPLES ===\n")
+    result5 = lazy.chain5.invoke(fewshot_inline_inputs)
+    print(f"Few-shot classification:\n{result5}\n")
+    print("="*100 + "\n")
@@ -0,0 +1,232 @@
+"""
+Day 3-4: Near-Duplicate Alert Suppression
+Learning: MinHash + LSH clusters near-identical alerts inside a time window,
+so an alert storm costs one LLM call per cluster instead of one per alert
+"""
+
+import random
+import re
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Large prime for the universal hash family h(x) = (a*x + b) mod p
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Hostnames, IPs and numbers differ between otherwise identical alerts
+_VOLATILE = re.compile(r"\b(?:\d{1,3}(?:\.\d{1,3}){3}|[a-z]+(?:[-_][a-z0-9]+)*[-_]?\d+[a-z0-9]*|\d+(?:\.\d+)?[a-z]*)\b")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, mask hosts/IPs/numbers and collapse whitespace"""
+    return " ".join(_VOLATILE.sub("#", text.lower()).split())
+
+
+def shingles(text: str, size: int = 4) -> set:
+    """Character shingles of the normalized text, hashed to 32-bit ints"""
+    text = normalize(text)
+    if len(text) <= size:
+        return {zlib.crc32(text.encode())}
+    return {zlib.crc32(text[i:i + size].encode()) for i in range(len(text) - size + 1)}
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to threshold"""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+
+class _Cluster:
+    def __init__(self, cluster_id: int, representative: str, signature: List[int], seen_at: float):
+        self.cluster_id = cluster_id
+        self.representative = representative
+        self.signature = signature
+        self.first_seen = seen_at
+        self.members: List[str] = []
+        self.result: Any = None
+        self.has_result = False
+
+
+class AlertDeduper:
+    """Streaming near-duplicate clustering for alert/incident text.
+
+    ``threshold`` is the estimated Jaccard similarity (over character
+    shingles, with hosts and numbers masked) above which two alerts are the
+    same cluster. Clusters expire ``window_seconds`` after their first alert.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        window_seconds: float = 300.0,
+        num_perm: int = 64,
+        shingle_size: int = 4,
+        seed: int = 42,
+    ):
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._buckets: List[Dict[tuple, List[_Cluster]]] = [{} for _ in range(self.bands)]
+        self._clusters: List[_Cluster] = []
+        self._next_id = 0
+        self.alerts_seen = 0
+        self.alerts_processed = 0
+        self.llm_calls = 0
+
+    # ------------------------------------------------------------------
+    # MinHash / LSH
+    # ------------------------------------------------------------------
+
+    def signature(self, text: str) -> List[int]:
+        hashed = shingles(text, self.shingle_size)
+        return [min(((a * x + b) % _PRIME) & _MAX_HASH for x in hashed) for a, b in self._perms]
+
+    def _band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    @staticmethod
+    def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+        """MinHash estimate of Jaccard similarity"""
+        return sum(a == b for a, b in zip(sig_a, sig_b)) / len(sig_a)
+
+    def _expire(self, now: float) -> None:
+        live = [c for c in self._clusters if now - c.first_seen <= self.window_seconds]
+        if len(live) == len(self._clusters):
+            return
+        self._clusters = live
+        live_ids = {id(c) for c in live}
+        for buckets in self._buckets:
+            for key in list(buckets):
+                buckets[key] = [c for c in buckets[key] if id(c) in live_ids]
+                if not buckets[key]:
+                    del buckets[key]
+
+    def assign(self, text: str, now: Optional[float] = None) -> Tuple[_Cluster, bool]:
+        """Place an alert in a cluster; returns (cluster, is_new_cluster)"""
+        now = time.time() if now is None else now
+        self._expire(now)
+        self.alerts_seen += 1
+        signature = self.signature(text)
+
+        candidates = {}
+        for band, key in self._band_keys(signature):
+            for cluster in self._buckets[band].get(key, []):
+                candidates[id(cluster)] = cluster
+        best = max(candidates.values(), key=lambda c: self.similarity(signature, c.signature), default=None)
+        if best is not None and self.similarity(signature, best.signature) >= self.threshold:
+            best.members.append(text)
+            return best, False
+
+        cluster = _Cluster(self._next_id, text, signature, now)
+        cluster.members.append(text)
+        self._next_id += 1
+        self._clusters.append(cluster)
+        for band, key in self._band_keys(signature):
+            self._buckets[band].setdefault(key, []).append(cluster)
+        return cluster, True
+
+    # ------------------------------------------------------------------
+    # LLM fan-out
+    # ------------------------------------------------------------------
+
+    def process(
+        self,
+        alerts: List[str],
+        call_llm: Callable[[List[str]], List[Any]],
+        now: Optional[float] = None,
+    ) -> List[Any]:
+        """Run ``call_llm`` once per new cluster and fan results out.
+
+        ``call_llm`` takes a list of representative alerts and returns one
+        result per alert, e.g. ``lambda reps: format_chain.batch([{"input": r} for r in reps])``.
+        Results come back in the same order as ``alerts``.
+        """
+        assigned = [self.assign(alert, now)[0] for alert in alerts]
+        self.alerts_processed += len(alerts)
+
+        pending = []
+        for cluster in assigned:
+            if not cluster.has_result and cluster not in pending:
+                pending.append(cluster)
+        if pending:
+            results = call_llm([c.representative for c in pending])
+            self.llm_calls += len(pending)
+            for cluster, result in zip(pending, results):
+                cluster.result, cluster.has_result = result, True
+
+        return [cluster.result for cluster in assigned]
+
+    def stats(self) -> Dict[str, Any]:
+        avoided = self.alerts_processed - self.llm_calls
+        return {
+            "alerts_seen": self.alerts_seen,
+            "live_clusters": len(self._clusters),
+            "llm_calls": self.llm_calls,
+            "llm_calls_avoided": avoided,
+            "avoided_ratio": avoided / self.alerts_processed if self.alerts_processed else 0.0,
+            "lsh_bands_rows": (self.bands, self.rows),
+        }
+
+
+def synthetic_alert_storm(count: int, seed: int = 7) -> List[str]:
+    """Outage-style stream: a few alert templates repeated across many hosts"""
+    rng = random.Random(seed)
+    templates = [
+        "CPU utilization exceeding normal range on payment servers ({host})",
+        "CPU utilization {pct}% exceeding normal range on payment server {host}",
+        "Failed login attempts increasing dramatically on {host}",
+        "Transaction reconciliation batch job timing out on {host} after {secs}s",
+        "Database connection pool at {pct}% capacity on {host}",
+    ]
+    one_offs = [
+        "SSL certificate for admin portal expires in 3 days",
+        "Scheduled maintenance notification email not sent to customers",
+    ]
+    alerts = []
+    for _ in range(count):
+        if rng.random() < 0.02:
+            alerts.append(rng.choice(one_offs))
+            continue
+        alerts.append(rng.choice(templates).format(
+            host=f"pay-srv-{rng.randint(1, 40):02d}",
+            pct=rng.randint(85, 99),
+            secs=rng.randint(30, 900),
+        ))
+    return alerts
+
+
+if __name__ == "__main__":
+    from fewshot_prompting import format_chain
+
+    alerts = synthetic_alert_storm(300)
+
+    print("=== NEAR-DUPLICATE ALERT SUPPRESSION ===\n")
+    for threshold in [0.5, 0.7, 0.9]:
+        deduper = AlertDeduper(threshold=threshold)
+        for alert in alerts:
+            deduper.assign(alert)
+        stats = deduper.stats()
+        print(f"threshold {threshold}: {stats['live_clusters']:>3} clusters for "
+              f"{stats['alerts_seen']} alerts (LSH bands x rows = {stats['lsh_bands_rows']})")
+    print()
+
+    deduper = AlertDeduper(threshold=0.7)
+    start = time.perf_counter()
+    results = deduper.process(
+        alerts,
+        lambda reps: format_chain.batch([{"input": rep} for rep in reps], config={"max_concurrency": 4}),
+    )
+    elapsed = time.perf_counter() - start
+
+    for alert, result in list(zip(alerts, results))[:5]:
+        print(f"Alert: {alert}\nStructured: {result.strip()}\n")
+
+    stats = deduper.stats()
+    print(f"LLM calls: {stats['llm_calls']} for {stats['alerts_seen']} alerts "
+          f"({stats['llm_calls_avoided']} avoided, {stats['avoided_ratio']:.0%}) in {elapsed:.1f}s")
+    print("\n" + "="*100 + "\n")
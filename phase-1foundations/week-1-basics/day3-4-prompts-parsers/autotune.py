@@ -0,0 +1,326 @@
+"""
+Day 3-4: Extraction Autotuner
+Learning: Sweep model, sampling options and prompt variant over a labeled
+incident set, score each config on validity, accuracy, tokens and latency,
+and keep the Pareto-optimal config per schema as a loadable profile
+"""
+
+import glob
+import itertools
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from langchain_core.prompts import PromptTemplate
+from langchain_ollama import OllamaLLM
+from pydantic import BaseModel
+
+from fast_parsers import FastPydanticOutputParser
+from llm_cassette import wrap_llm
+from token_accounting import TokenAccountant
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROFILE_PATH = os.path.join(HERE, "tuned_profile.json")
+
+SEARCH_SPACE = {
+    "model": ["command-r", "phi3"],
+    "temperature": [0.0, 0.3],
+    "num_ctx": [2048, 4096],
+    "num_predict": [512, 1024],
+    "prompt_variant": ["full", "compact"],
+}
+
+
+class TuningConfig(BaseModel):
+    """One point of the search space"""
+    model: str
+    temperature: float
+    num_ctx: int
+    num_predict: int
+    prompt_variant: str
+
+
+class ConfigResult(BaseModel):
+    """Averaged measurements of one config on one schema's labeled set"""
+    schema_name: str
+    config: TuningConfig
+    calls: int
+    valid_rate: float
+    field_accuracy: float
+    tokens: float
+    """Mean prompt + output tokens per call (Ollama's counts)"""
+    latency_s: float
+
+
+def grid(space: Dict[str, List[Any]] = SEARCH_SPACE) -> List[TuningConfig]:
+    keys = list(space)
+    return [TuningConfig(**dict(zip(keys, values))) for values in itertools.product(*space.values())]
+
+
+def build_llm(config: TuningConfig, **kwargs: Any):
+    return wrap_llm(OllamaLLM(
+        model=config.model,
+        temperature=config.temperature,
+        num_ctx=config.num_ctx,
+        num_predict=config.num_predict,
+        **kwargs,
+    ))
+
+
+# ============================================================================
+# Schemas, prompts and labeled cases
+# ============================================================================
+
+COMPACT_TEMPLATE = """Extract a {schema_name} from the text below as JSON.
+
+{text}
+
+{format_instructions}
+
+JSON only:"""
+
+
+class SchemaTask:
+    """A schema, its hand-written ("full") prompt and labeled (text, expected) cases"""
+
+    def __init__(self, name: str, model: Type[BaseModel], full_prompt: PromptTemplate,
+                 cases: List[Dict[str, Any]]):
+        self.name = name
+        self.model = model
+        self.parser = FastPydanticOutputParser(pydantic_object=model)
+        self.input_key = full_prompt.input_variables[0]
+        self.prompts = {
+            "full": full_prompt,
+            "compact": PromptTemplate(
+                input_variables=[self.input_key],
+                template=COMPACT_TEMPLATE.replace("{text}", "{" + self.input_key + "}"),
+                partial_variables={"schema_name": name,
+                                   "format_instructions": self.parser.get_format_instructions()},
+            ),
+        }
+        self.cases = cases
+
+
+def load_incident_labels(pattern: str = os.path.join(HERE, "incident_INC_*.json")) -> Dict[str, dict]:
+    """Saved extractions from day3_4_exercise.py, keyed by incident id"""
+    labels = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path) as f:
+            record = json.load(f)
+        labels[record["incident_id"]] = record
+    return labels
+
+
+def incident_report_label(incident: dict) -> dict:
+    """IncidentReport fields derivable from a saved ProductionIncident"""
+    impact = incident["impact_metrics"]
+    return {
+        "incident_id": incident["incident_id"],
+        "severity": incident["severity"],
+        "description": incident["description"],
+        "affected_systems": incident["root_cause"]["affected_components"],
+        "estimated_impact": " ".join(str(v) for v in impact.values() if v is not None),
+    }
+
+
+# The saved incidents carry no system health data: this case is labeled by hand
+# from structured_outputs.system_data
+SYSTEM_HEALTH_LABEL = {
+    "system_name": "Payment Processing Service",
+    "availability_percentage": 99.2,
+    "sla_metrics": {
+        "target_response_time_ms": 500,
+        "actual_response_time_ms": 850,
+        "breach_status": "BREACHED",
+        "breach_duration_minutes": 45,
+    },
+    "error_count_24h": 234,
+    "recommendation": "Immediate scaling of compute resources",
+}
+
+
+def build_tasks() -> List[SchemaTask]:
+    from day3_4_exercise import ProductionIncident, main_prompt, test_incidents
+    from structured_outputs import IncidentReport, SystemHealth, prompt, prompt2, system_data
+
+    labels = load_incident_labels()
+    labeled = []
+    for text in test_incidents:
+        match = re.search(r"INC-\d{4}-\d+", text)
+        if match and match.group(0) in labels:
+            labeled.append((text, labels[match.group(0)]))
+    if not labeled:
+        raise FileNotFoundError("No incident_INC_*.json labels: run day3_4_exercise.py first")
+
+    return [
+        SchemaTask("ProductionIncident", ProductionIncident, main_prompt,
+                   [{"text": text, "expected": label} for text, label in labeled]),
+        SchemaTask("IncidentReport", IncidentReport, prompt,
+                   [{"text": text, "expected": incident_report_label(label)} for text, label in labeled]),
+        SchemaTask("SystemHealth", SystemHealth, prompt2,
+                   [{"text": system_data, "expected": SYSTEM_HEALTH_LABEL}]),
+    ]
+
+
+# ============================================================================
+# Scoring
+# ============================================================================
+
+def _words(value: Any) -> set:
+    return set(re.findall(r"[a-z0-9]+", str(value).lower()))
+
+
+def leaf_score(expected: Any, actual: Any) -> float:
+    """Similarity of one field in [0, 1]"""
+    if expected is None:
+        return 1.0 if actual is None else 0.5
+    if actual is None:
+        return 0.0
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return float(expected == actual)
+    if isinstance(expected, (int, float)):
+        try:
+            actual = float(actual)
+        except (TypeError, ValueError):
+            return 0.0
+        return float(abs(actual - expected) <= 0.05 * max(abs(expected), 1.0))
+    if isinstance(expected, list):
+        expected_words = _words(" ".join(map(str, expected)))
+        actual_words = _words(" ".join(map(str, actual))) if isinstance(actual, list) else _words(actual)
+    else:
+        expected_words, actual_words = _words(expected), _words(actual)
+    if len(expected_words) <= 3:
+        # ids, enums, short names: must match exactly
+        return float(expected_words == actual_words)
+    union = expected_words | actual_words
+    return len(expected_words & actual_words) / len(union) if union else 1.0
+
+
+def field_accuracy(expected: dict, actual: Optional[dict]) -> float:
+    """Mean leaf score over every field of the label"""
+    scores = []
+
+    def walk(exp: Any, act: Any) -> None:
+        if isinstance(exp, dict):
+            for key, value in exp.items():
+                walk(value, act.get(key) if isinstance(act, dict) else None)
+        else:
+            scores.append(leaf_score(exp, act))
+
+    walk(expected, actual or {})
+    return sum(scores) / len(scores) if scores else 0.0
+
+
+# ============================================================================
+# Sweep
+# ============================================================================
+
+def evaluate(task: SchemaTask, config: TuningConfig, repeats: int = 1, **llm_kwargs: Any) -> ConfigResult:
+    accountant = TokenAccountant(num_ctx=config.num_ctx, num_predict=config.num_predict)
+    chain = task.prompts[config.prompt_variant] | build_llm(config, **llm_kwargs)
+    valid, accuracy, latency = 0, 0.0, 0.0
+    calls = 0
+    for case in task.cases:
+        for _ in range(repeats):
+            calls += 1
+            start = time.perf_counter()
+            try:
+                raw = chain.invoke({task.input_key: case["text"]},
+                                   config={"callbacks": [accountant], "metadata": {"chain": task.name}})
+            except Exception as e:
+                print(f"   ❌ {config.model}: {e}")
+                latency += time.perf_counter() - start
+                continue
+            latency += time.perf_counter() - start
+            try:
+                parsed = task.parser.parse(raw).model_dump()
+                valid += 1
+            except Exception:
+                parsed = None
+            accuracy += field_accuracy(case["expected"], parsed)
+
+    tokens = [(r.prompt_eval_count or r.estimated_prompt_tokens) + (r.eval_count or 0)
+              for r in accountant.records]
+    return ConfigResult(
+        schema_name=task.name,
+        config=config,
+        calls=calls,
+        valid_rate=valid / calls,
+        field_accuracy=accuracy / calls,
+        tokens=sum(tokens) / len(tokens) if tokens else 0.0,
+        latency_s=latency / calls,
+    )
+
+
+def dominates(a: ConfigResult, b: ConfigResult) -> bool:
+    """a is no worse than b on every objective and better on at least one"""
+    no_worse = (a.valid_rate >= b.valid_rate and a.field_accuracy >= b.field_accuracy
+                and a.tokens <= b.tokens and a.latency_s <= b.latency_s)
+    better = (a.valid_rate > b.valid_rate or a.field_accuracy > b.field_accuracy
+              or a.tokens < b.tokens or a.latency_s < b.latency_s)
+    return no_worse and better
+
+
+def pareto_front(results: List[ConfigResult]) -> List[ConfigResult]:
+    return [r for r in results if not any(dominates(other, r) for other in results)]
+
+
+def choose(front: List[ConfigResult], min_valid_rate: float = 1.0) -> ConfigResult:
+    """Pick one config off the front: fully valid first, then most accurate, then fastest"""
+    eligible = [r for r in front if r.valid_rate >= min_valid_rate] or front
+    return max(eligible, key=lambda r: (round(r.field_accuracy, 2), -r.latency_s, -r.tokens))
+
+
+def autotune(tasks: List[SchemaTask], configs: List[TuningConfig], repeats: int = 1,
+             **llm_kwargs: Any) -> Dict[str, Dict[str, Any]]:
+    profile = {}
+    for task in tasks:
+        print(f"\n--- {task.name}: {len(configs)} configs x {len(task.cases)} cases ---")
+        results = []
+        for config in configs:
+            result = evaluate(task, config, repeats, **llm_kwargs)
+            results.append(result)
+            print(f"   {config.model:<10} t={config.temperature:<4} ctx={config.num_ctx:<5} "
+                  f"predict={config.num_predict:<5} {config.prompt_variant:<8} "
+                  f"valid={result.valid_rate:>4.0%} acc={result.field_accuracy:>4.0%} "
+                  f"tokens={result.tokens:>6.0f} latency={result.latency_s:>6.2f}s")
+        front = pareto_front(results)
+        best = choose(front)
+        profile[task.name] = {
+            "config": best.config.model_dump(),
+            "metrics": best.model_dump(exclude={"config", "schema_name"}),
+            "pareto_front": [r.model_dump(exclude={"schema_name"}) for r in front],
+        }
+    return profile
+
+
+def save_profile(profile: Dict[str, Dict[str, Any]], path: str = PROFILE_PATH) -> None:
+    with open(path, "w") as f:
+        json.dump(profile, f, indent=2)
+
+
+def load_profile(schema_name: str, path: str = PROFILE_PATH) -> TuningConfig:
+    """Tuned config for a schema; use with build_llm() and SchemaTask.prompts"""
+    with open(path) as f:
+        return TuningConfig(**json.load(f)[schema_name]["config"])
+
+
+if __name__ == "__main__":
+    tasks = build_tasks()
+    configs = grid()
+    print(f"=== AUTOTUNE: {len(configs)} configs over {len(tasks)} schemas ===")
+    profile = autotune(tasks, configs)
+    save_profile(profile)
+
+    print("\n=== TUNED PROFILE ===\n")
+    for schema_name, entry in profile.items():
+        config, metrics = entry["config"], entry["metrics"]
+        print(f"{schema_name:<20} {config['model']} t={config['temperature']} ctx={config['num_ctx']} "
+              f"predict={config['num_predict']} prompt={config['prompt_variant']}")
+        print(f"{'':<20} valid={metrics['valid_rate']:.0%} acc={metrics['field_accuracy']:.0%} "
+              f"tokens={metrics['tokens']:.0f} latency={metrics['latency_s']:.2f}s "
+              f"({len(entry['pareto_front'])} configs on the Pareto front)")
+    print(f"\nSaved to {PROFILE_PATH}; load with load_profile('ProductionIncident')")
+    print("\n" + "="*100 + "\n")
@@ -0,0 +1,369 @@
+"""
+Day 3-4: Circuit Breaker & Load Shedding
+Learning: Stop hammering an overloaded Ollama - trip on error rate or slow
+calls, probe before closing again, and shed low-priority work first
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseLLM
+from langchain_core.outputs import LLMResult
+from pydantic import PrivateAttr
+
+CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+# Share of the breaker's "pressure" each priority is still admitted under:
+# LOW work (few-shot demos, LOW-severity items) goes first, HIGH last
+ADMIT_BELOW = {"HIGH": 1.0, "NORMAL": 0.8, "LOW": 0.5}
+
+
+class CircuitOpenError(RuntimeError):
+    """Rejected without calling the backend because the circuit is open"""
+
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RequestShed(CircuitOpenError):
+    """Rejected by load shedding; low-priority work can be deferred and retried"""
+
+
+def priority_for_severity(severity: str) -> str:
+    """Map incident severity (CRITICAL/HIGH/MEDIUM/LOW) to a call priority"""
+    severity = (severity or "").upper()
+    if severity in ("CRITICAL", "HIGH"):
+        return "HIGH"
+    if severity == "LOW":
+        return "LOW"
+    return "NORMAL"
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker with priority-based load shedding.
+
+    CLOSED -> OPEN when, over the last ``window`` calls made within
+    ``window_seconds`` (at least ``min_calls``), the error rate reaches ``trip_error_rate`` or the share
+    of calls slower than ``slow_call_seconds`` reaches ``trip_slow_rate``.
+    OPEN -> HALF_OPEN after ``open_seconds``; up to ``half_open_probes``
+    calls are let through and their outcome closes or re-opens the circuit.
+
+    While CLOSED, "pressure" (the worst of error rate, slow rate and
+    in-flight calls, each relative to its limit) decides which priorities
+    are still admitted - see ADMIT_BELOW. Outcomes age out after
+    ``window_seconds`` so shed traffic is readmitted even if nothing else
+    is calling the backend.
+    """
+
+    def __init__(
+        self,
+        name: str = "ollama",
+        window: int = 20,
+        window_seconds: float = 60.0,
+        min_calls: int = 5,
+        trip_error_rate: float = 0.5,
+        slow_call_seconds: float = 60.0,
+        trip_slow_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+        max_in_flight: int = 8,
+        on_state_change: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.trip_error_rate = trip_error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.trip_slow_rate = trip_slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.max_in_flight = max_in_flight
+        self.on_state_change = on_state_change
+
+        self.state = CLOSED
+        self.transitions: List[Dict[str, Any]] = []
+        self._outcomes: deque = deque(maxlen=window)  # (finished_at, ok, seconds)
+        self._opened_at = 0.0
+        self._in_flight = 0
+        self._probes_in_flight = 0
+        self._counters = {"calls": 0, "failures": 0, "rejected_open": 0, "shed": 0}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def _rates(self):
+        horizon = time.monotonic() - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            self._outcomes.popleft()
+        if len(self._outcomes) < self.min_calls:
+            return 0.0, 0.0
+        total = len(self._outcomes)
+        errors = sum(not ok for _, ok, _ in self._outcomes)
+        slow = sum(seconds >= self.slow_call_seconds for _, ok, seconds in self._outcomes if ok)
+        return errors / total, slow / total
+
+    def pressure(self) -> float:
+        error_rate, slow_rate = self._rates()
+        return max(
+            error_rate / self.trip_error_rate,
+            slow_rate / self.trip_slow_rate,
+            self._in_flight / self.max_in_flight,
+        )
+
+    def _transition(self, new_state: str, reason: str) -> None:
+        old_state, self.state = self.state, new_state
+        self.transitions.append({"at": time.time(), "from": old_state, "to": new_state, "reason": reason})
+        if new_state == OPEN:
+            self._opened_at = time.monotonic()
+        if new_state == CLOSED:
+            self._outcomes.clear()
+        if self.on_state_change:
+            self.on_state_change(old_state, new_state, reason)
+
+    # ------------------------------------------------------------------
+    # Call protocol
+    # ------------------------------------------------------------------
+
+    def before_call(self, priority: str = "NORMAL") -> bool:
+        """Admit or reject a call. Returns True when the call is a half-open probe."""
+        with self._lock:
+            if self.state == OPEN:
+                waited = time.monotonic() - self._opened_at
+                if waited < self.open_seconds:
+                    self._counters["rejected_open"] += 1
+                    raise CircuitOpenError(f"Circuit '{self.name}' is OPEN",
+                                           retry_after=self.open_seconds - waited)
+                self._transition(HALF_OPEN, f"open for {self.open_seconds:.0f}s, probing")
+
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.half_open_probes:
+                    self._counters["rejected_open"] += 1
+                    raise CircuitOpenError(f"Circuit '{self.name}' is HALF_OPEN, probe in flight",
+                                           retry_after=1.0)
+                self._probes_in_flight += 1
+                self._in_flight += 1
+                return True
+
+            if self.pressure() >= ADMIT_BELOW.get(priority, ADMIT_BELOW["NORMAL"]):
+                self._counters["shed"] += 1
+                raise RequestShed(f"Shed {priority} request: backend pressure {self.pressure():.2f}",
+                                  retry_after=5.0)
+            self._in_flight += 1
+            return False
+
+    def after_call(self, ok: bool, seconds: float, probe: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._counters["calls"] += 1
+            self._counters["failures"] += not ok
+            if probe:
+                self._probes_in_flight -= 1
+                if self.state == HALF_OPEN:
+                    if ok and seconds < self.slow_call_seconds:
+                        self._transition(CLOSED, "probe succeeded")
+                    else:
+                        self._transition(OPEN, "probe failed")
+                return
+
+            self._outcomes.append((time.monotonic(), ok, seconds))
+            if self.state == CLOSED:
+                error_rate, slow_rate = self._rates()
+                if error_rate >= self.trip_error_rate:
+                    self._transition(OPEN, f"error rate {error_rate:.0%}")
+                elif slow_rate >= self.trip_slow_rate:
+                    self._transition(OPEN, f"slow-call rate {slow_rate:.0%}")
+
+    def call(self, fn: Callable[[], Any], priority: str = "NORMAL") -> Any:
+        probe = self.before_call(priority)
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception:
+            self.after_call(False, time.perf_counter() - start, probe)
+            raise
+        self.after_call(True, time.perf_counter() - start, probe)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Observable state for logs/dashboards"""
+        with self._lock:
+            error_rate, slow_rate = self._rates()
+            return {
+                "name": self.name,
+                "state": self.state,
+                "error_rate": error_rate,
+                "slow_rate": slow_rate,
+                "in_flight": self._in_flight,
+                "pressure": self.pressure(),
+                **self._counters,
+                "transitions": len(self.transitions),
+            }
+
+
+class GuardedLLM(BaseLLM):
+    """Wraps an LLM so every call goes through a CircuitBreaker.
+
+    Priority comes from the call's config metadata, e.g.
+    ``chain.invoke(x, config={"metadata": {"priority": "LOW"}})``.
+    """
+    llm: BaseLLM
+    default_priority: str = "NORMAL"
+
+    _breaker: CircuitBreaker = PrivateAttr()
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._breaker = breaker or CircuitBreaker()
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def _llm_type(self) -> str:
+        return "guarded"
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        metadata = run_manager.metadata if run_manager else {}
+        priority = (metadata or {}).get("priority", self.default_priority)
+        return self._breaker.call(
+            lambda: self.llm._generate(prompts, stop=stop, **kwargs), priority=priority)
+
+
+class DeferredQueue:
+    """Holds shed LOW/NORMAL work and replays it once the breaker has room"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.pending: List[Dict[str, Any]] = []
+
+    def submit(self, fn: Callable[[], Any], priority: str = "NORMAL", label: str = "") -> Optional[Any]:
+        """Run ``fn`` now, or defer it (returning None) if it is shed"""
+        try:
+            return fn()
+        except RequestShed:
+            self.pending.append({"fn": fn, "priority": priority, "label": label})
+            return None
+
+    def drain(self) -> List[Any]:
+        """Replay deferred work while the circuit is CLOSED and not shedding"""
+        results = []
+        while self.pending and self.breaker.state == CLOSED:
+            item = self.pending[0]
+            try:
+                results.append(item["fn"]())
+            except CircuitOpenError:
+                break
+            self.pending.pop(0)
+        return results
+
+
+# ============================================================================
+# Fault-injection check against a local fake Ollama
+# ============================================================================
+
+if __name__ == "__main__":
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_ollama import OllamaLLM
+
+    from fake_ollama import FakeOllamaServer
+    from fewshot_prompting import few_shot_prompt, test_incidents
+
+    def log_transition(old: str, new: str, reason: str) -> None:
+        print(f"   🔀 circuit {old} -> {new} ({reason})")
+
+    def submit_incident(incident: str, severity: str):
+        """Incident work carries the priority of its severity"""
+        return chain.invoke({"incident": incident},
+                            config={"metadata": {"priority": priority_for_severity(severity)}})
+
+    def run(label: str, calls: int, severity: str = "MEDIUM") -> Dict[str, int]:
+        outcome = {"ok": 0, "failed": 0, "rejected": 0, "shed": 0}
+        for _ in range(calls):
+            try:
+                submit_incident("Payment API latency increased", severity)
+                outcome["ok"] += 1
+            except RequestShed:
+                outcome["shed"] += 1
+            except CircuitOpenError:
+                outcome["rejected"] += 1
+            except Exception:
+                outcome["failed"] += 1
+        print(f"{label:<40} {outcome}  state={breaker.state}")
+        return outcome
+
+    print("=== CIRCUIT BREAKER: FAULT INJECTION ===\n")
+    with FakeOllamaServer(token_delay=0.001, seed=1) as fake:
+        breaker = CircuitBreaker(window=10, min_calls=5, open_seconds=1.0,
+                                 slow_call_seconds=0.5, on_state_change=log_transition)
+        guarded = GuardedLLM(llm=OllamaLLM(model="command-r", base_url=fake.url), breaker=breaker)
+        chain = few_shot_prompt | guarded | StrOutputParser()
+
+        healthy = run("1. Healthy backend", 10)
+        assert healthy["ok"] == 10 and breaker.state == CLOSED
+
+        fake.error_rate = 1.0  # Ollama starts failing (overloaded / reloading)
+        before = fake.requests
+        run("2. Backend failing", 30, severity="CRITICAL")
+        assert breaker.state == OPEN
+        assert fake.requests - before < 30, "open circuit must stop traffic to the backend"
+        print(f"   backend saw {fake.requests - before} of 30 requests during the outage")
+
+        fake.error_rate = 0.0  # backend recovers
+        time.sleep(1.1)
+        recovered = run("3. After open_seconds (half-open probe)", 5)
+        assert breaker.state == CLOSED and recovered["ok"] == 5
+
+        # Degraded but below the trip threshold: every third call fails
+        for i in range(10):
+            fake.error_rate = 1.0 if i % 3 == 2 else 0.0
+            try:
+                submit_incident("Payment API latency increased", "CRITICAL")
+            except Exception:
+                pass
+        print(f"4. Degraded backend                       pressure={breaker.pressure():.2f}  "
+              f"state={breaker.state}")
+        assert breaker.state == CLOSED
+
+        # A few-shot demo (always LOW) competes with MEDIUM and CRITICAL incidents
+        deferred = DeferredQueue(breaker)
+        fake.error_rate = 0.0
+        work = [
+            ("few-shot demo", "LOW", lambda: chain.invoke(
+                {"incident": test_incidents[0]}, config={"metadata": {"priority": "LOW"}})),
+            ("MEDIUM incident", priority_for_severity("MEDIUM"),
+             lambda: submit_incident("Settlement report delayed by 30 minutes", "MEDIUM")),
+            ("CRITICAL incident", priority_for_severity("CRITICAL"),
+             lambda: submit_incident("Payment API returning 500 for all card payments", "CRITICAL")),
+        ]
+        admitted = {}
+        for label, priority, fn in work:
+            before_shed = breaker.snapshot()["shed"]
+            deferred.submit(fn, priority=priority, label=label)
+            admitted[label] = breaker.snapshot()["shed"] == before_shed
+        print(f"   admitted under pressure: {admitted} | deferred: "
+              f"{[item['label'] for item in deferred.pending]}")
+        assert not admitted["few-shot demo"] and admitted["MEDIUM incident"] and admitted["CRITICAL incident"]
+
+        # Healthy traffic pushes the failures out of the window, then replay
+        fake.error_rate = 0.0
+        run("5. Backend healthy again", 10, severity="CRITICAL")
+        replayed = deferred.drain()
+        print(f"   replayed {len(replayed)} deferred request(s), {len(deferred.pending)} still pending")
+        assert replayed and not deferred.pending
+
+    print(f"\nSnapshot: {breaker.snapshot()}")
+    print("\n✅ All fault-injection checks passed")
+    print("\n" + "="*100 + "\n")
@@ -0,0 +1,113 @@
+"""
+Day 3-4: Precompiled Few-Shot Prompts
+Learning: FewShotPromptTemplate re-formats every example and re-joins the
+whole prompt on each call; with static examples that work can be done once
+"""
+
+import time
+from typing import Any
+
+from langchain_core.prompts import FewShotPromptTemplate, StringPromptTemplate
+from langchain_core.prompts.string import get_template_variables
+
+
+class CompiledFewShotPromptTemplate(StringPromptTemplate):
+    """Few-shot prompt with the prefix and examples rendered ahead of time.
+
+    Produces exactly the same text as the FewShotPromptTemplate it was
+    compiled from; each call only substitutes the suffix variables.
+    """
+    static_text: str
+    """Prefix + examples + separator, already rendered"""
+    suffix_template: str
+    """The part that still needs the input variables (f-string)"""
+
+    @classmethod
+    def from_few_shot(cls, template: FewShotPromptTemplate) -> "CompiledFewShotPromptTemplate":
+        if template.example_selector is not None:
+            raise ValueError("Only templates with a static `examples` list can be compiled")
+        if template.template_format != "f-string":
+            raise ValueError(f"Unsupported template format: {template.template_format}")
+
+        # Same steps as FewShotPromptTemplate.format, minus the variables
+        example_strings = [
+            template.example_prompt.format(
+                **{k: example[k] for k in template.example_prompt.input_variables}
+            )
+            for example in template.examples
+        ]
+        static_pieces = [piece for piece in [template.prefix, *example_strings] if piece]
+        static_template = template.example_separator.join(static_pieces)
+
+        if get_template_variables(static_template, "f-string"):
+            # Prefix uses input variables too: only the example rendering is saved
+            pieces = static_pieces + ([template.suffix] if template.suffix else [])
+            static_text = ""
+            suffix_template = template.example_separator.join(pieces)
+        else:
+            # .format() with no arguments un-escapes any {{ }} in the static part
+            static_text = static_template.format()
+            if static_text and template.suffix:
+                static_text += template.example_separator
+            suffix_template = template.suffix
+
+        return cls(
+            input_variables=template.input_variables,
+            partial_variables=template.partial_variables,
+            static_text=static_text,
+            suffix_template=suffix_template,
+        )
+
+    def format(self, **kwargs: Any) -> str:
+        kwargs = self._merge_partial_and_user_variables(**kwargs)
+        return self.static_text + self.suffix_template.format(**kwargs)
+
+    @property
+    def _prompt_type(self) -> str:
+        return "compiled_few_shot"
+
+
+def compile_few_shot(template: FewShotPromptTemplate) -> CompiledFewShotPromptTemplate:
+    """Shortcut for CompiledFewShotPromptTemplate.from_few_shot"""
+    return CompiledFewShotPromptTemplate.from_few_shot(template)
+
+
+# ============================================================================
+# Benchmark: 100k renders, stock vs compiled
+# ============================================================================
+
+BENCH_RENDERS = 100_000
+
+
+def time_renders(template, variable: str, inputs: list) -> tuple:
+    """Return (seconds, rendered prompts)"""
+    start = time.perf_counter()
+    rendered = [template.format(**{variable: value}) for value in inputs]
+    return time.perf_counter() - start, rendered
+
+
+if __name__ == "__main__":
+    from fewshot_prompting import (
+        few_shot_prompt, sla_few_shot, format_few_shot,
+        test_incidents, test_scenarios, test_alerts,
+    )
+
+    benchmarks = [
+        ("Incident classification", few_shot_prompt, "incident", test_incidents),
+        ("SLA calculation", sla_few_shot, "scenario", test_scenarios),
+        ("Alert formatting", format_few_shot, "input", test_alerts),
+    ]
+
+    print("=== PRECOMPILED FEW-SHOT RENDERING ===\n")
+    print(f"{'Template':<26} {'Stock/s':>12} {'Compiled/s':>12} {'Speedup':>9}  Identical")
+    for name, stock, variable, samples in benchmarks:
+        inputs = [f"{samples[i % len(samples)]} (#{i})" for i in range(BENCH_RENDERS)]
+        compiled = compile_few_shot(stock)
+
+        stock_seconds, stock_out = time_renders(stock, variable, inputs)
+        compiled_seconds, compiled_out = time_renders(compiled, variable, inputs)
+
+        print(f"{name:<26} {BENCH_RENDERS / stock_seconds:>12,.0f} {BENCH_RENDERS / compiled_seconds:>12,.0f} "
+              f"{stock_seconds / compiled_seconds:>8.1f}x  {stock_out == compiled_out}")
+
+    print("\n" + "="*100 + "\n")
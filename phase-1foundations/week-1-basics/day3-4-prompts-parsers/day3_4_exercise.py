@@ -6,13 +6,18 @@ Real-world application: Parse unstructured incident reports into structured data
 
 from langchain_ollama import OllamaLLM
 from langchain_core.prompts import PromptTemplate, FewShotPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 import json
+import time
 
-llm = OllamaLLM(model="command-r", temperature=0.3)
+from deadlines import DeadlineExceeded, invoke_with_deadline
+from fast_parsers import FastPydanticOutputParser
+from llm_cassette import wrap_llm
+
+# wrap_llm: set LLM_CASSETTE to record/replay responses offline (see llm_cassette.py)
+llm = wrap_llm(OllamaLLM(model="command-r", temperature=0.3))
 
 # ============================================================================
 # Define Comprehensive Data Schema
@@ -54,7 +59,8 @@ class ProductionIncident(BaseModel):
 # Create Parser and Prompt
 # ============================================================================
 
-parser = PydanticOutputParser(pydantic_object=ProductionIncident)
+# Tolerant fast-path parser: formatting slips are repaired instead of retried
+parser = FastPydanticOutputParser(pydantic_object=ProductionIncident)
 
 # Few-shot examples for better extraction
 examples = [
@@ -227,81 +233,94 @@ test_incidents = [
 # Process and Display Results
 # ============================================================================
 
-def safe_extract(incident_text, attempt_num=1, max_attempts=2):
-    """Extract with retry logic"""
+def safe_extract(incident_text, attempt_num=1, max_attempts=2, deadline=None):
+    """Extract with retry logic.
+
+    With a `deadlines.Deadline`, every attempt is cancelled when the budget
+    runs out and a retry only starts if the time left covers another
+    attempt as long as the last one. Raises DeadlineExceeded in that case,
+    so callers can count it separately from parse failures.
+    """
+    start = time.perf_counter()
     try:
-        result = chain.invoke({"incident_text": incident_text})
+        result = invoke_with_deadline(chain, {"incident_text": incident_text}, deadline)
         return result, True
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"   ⚠️  Extraction attempt {attempt_num} failed: {str(e)[:100]}")
         if attempt_num < max_attempts:
+            if deadline is not None and not deadline.allows(time.perf_counter() - start):
+                raise DeadlineExceeded(
+                    f"{deadline.remaining():.1f}s left, not enough for another attempt") from e
             print(f"   🔄 Retrying...")
-            return safe_extract(incident_text, attempt_num + 1, max_attempts)
+            return safe_extract(incident_text, attempt_num + 1, max_attempts, deadline)
         return None, False
 
-print("="*100)
-print("PRODUCTION INCIDENT DATA EXTRACTION SYSTEM")
-print("="*100 + "\n")
+if __name__ == "__main__":
+    print("="*100)
+    print("PRODUCTION INCIDENT DATA EXTRACTION SYSTEM")
+    print("="*100 + "\n")
 
-for i, incident in enumerate(test_incidents, 1):
-    print(f"\n{'='*100}")
-    print(f"TEST CASE {i}")
-    print(f"{'='*100}\n")
+    for i, incident in enumerate(test_incidents, 1):
+        print(f"\n{'='*100}")
+        print(f"TEST CASE {i}")
+        print(f"{'='*100}\n")
     
-    print(f"Raw Incident Report (first 200 chars):\n{incident[:200]}...\n")
-    print("🔄 Extracting structured data...\n")
+        print(f"Raw Incident Report (first 200 chars):\n{incident[:200]}...\n")
+        print("🔄 Extracting structured data...\n")
     
-    result, success = safe_extract(incident)
+        result, success = safe_extract(incident)
     
-    if success and result:
-        print("✅ EXTRACTION SUCCESSFUL\n")
-        print(f"📋 INCIDENT SUMMARY")
-        print(f"   ID: {result.incident_id}")
-        print(f"   Title: {result.title}")
-        print(f"   Severity: {result.severity}")
-        print(f"   Category: {result.category}")
-        print(f"   Priority Score: {result.priority_score}/10\n")
+        if success and result:
+            print("✅ EXTRACTION SUCCESSFUL\n")
+            print(f"📋 INCIDENT SUMMARY")
+            print(f"   ID: {result.incident_id}")
+            print(f"   Title: {result.title}")
+            print(f"   Severity: {result.severity}")
+            print(f"   Category: {result.category}")
+            print(f"   Priority Score: {result.priority_score}/10\n")
         
-        print(f"📊 IMPACT METRICS")
-        if result.impact_metrics.affected_user_count:
-            print(f"   Affected Users: {result.impact_metrics.affected_user_count:,}")
-        if result.impact_metrics.failed_transactions:
-            print(f"   Failed Transactions: {result.impact_metrics.failed_transactions:,}")
-        if result.impact_metrics.revenue_impact_usd:
-            print(f"   Revenue Impact: ${result.impact_metrics.revenue_impact_usd:,.2f}")
-        if result.impact_metrics.customer_complaints:
-            print(f"   Customer Complaints: {result.impact_metrics.customer_complaints}")
-        if result.impact_metrics.sla_breach_minutes:
-            print(f"   SLA Breach: {result.impact_metrics.sla_breach_minutes} minutes\n")
+            print(f"📊 IMPACT METRICS")
+            if result.impact_metrics.affected_user_count:
+                print(f"   Affected Users: {result.impact_metrics.affected_user_count:,}")
+            if result.impact_metrics.failed_transactions:
+                print(f"   Failed Transactions: {result.impact_metrics.failed_transactions:,}")
+            if result.impact_metrics.revenue_impact_usd:
+                print(f"   Revenue Impact: ${result.impact_metrics.revenue_impact_usd:,.2f}")
+            if result.impact_metrics.customer_complaints:
+                print(f"   Customer Complaints: {result.impact_metrics.customer_complaints}")
+            if result.impact_metrics.sla_breach_minutes:
+                print(f"   SLA Breach: {result.impact_metrics.sla_breach_minutes} minutes\n")
         
-        print(f"🔍 ROOT CAUSE ANALYSIS")
-        print(f"   Primary Cause: {result.root_cause.primary_cause}")
-        print(f"   Contributing Factors:")
-        for factor in result.root_cause.contributing_factors:
-            print(f"      • {factor}")
-        print(f"   Affected Components: {', '.join(result.root_cause.affected_components)}\n")
+            print(f"🔍 ROOT CAUSE ANALYSIS")
+            print(f"   Primary Cause: {result.root_cause.primary_cause}")
+            print(f"   Contributing Factors:")
+            for factor in result.root_cause.contributing_factors:
+                print(f"      • {factor}")
+            print(f"   Affected Components: {', '.join(result.root_cause.affected_components)}\n")
         
-        print(f"🛠️  RESOLUTION PLAN")
-        print(f"   Immediate Actions:")
-        for action in result.resolution.immediate_actions[:3]:  # Show first 3
-            print(f"      • {action}")
-        print(f"   Preventive Measures:")
-        for measure in result.resolution.preventive_measures[:3]:  # Show first 3
-            print(f"      • {measure}")
-        print(f"   Estimated Resolution: {result.resolution.estimated_resolution_hours} hours\n")
+            print(f"🛠️  RESOLUTION PLAN")
+            print(f"   Immediate Actions:")
+            for action in result.resolution.immediate_actions[:3]:  # Show first 3
+                print(f"      • {action}")
+            print(f"   Preventive Measures:")
+            for measure in result.resolution.preventive_measures[:3]:  # Show first 3
+                print(f"      • {measure}")
+            print(f"   Estimated Resolution: {result.resolution.estimated_resolution_hours} hours\n")
         
-        # Save to JSON file
-        output_file = f"incident_{result.incident_id.replace('-', '_')}.json"
-        with open(output_file, 'w') as f:
-            json.dump(result.dict(), f, indent=2)
-        print(f"💾 Saved to: {output_file}")
+            # Save to JSON file
+            output_file = f"incident_{result.incident_id.replace('-', '_')}.json"
+            with open(output_file, 'w') as f:
+                json.dump(result.dict(), f, indent=2)
+            print(f"💾 Saved to: {output_file}")
         
-    else:
-        print("❌ EXTRACTION FAILED")
-        print("   Manual review required\n")
+        else:
+            print("❌ EXTRACTION FAILED")
+            print("   Manual review required\n")
     
-    print(f"\n{'='*100}\n")
+        print(f"\n{'='*100}\n")
 
-print("\n🎯 EXTRACTION COMPLETE")
-print(f"Successfully processed {len(test_incidents)} incident reports")
-print("Check generated JSON files for full structured data\n")
+    print("\n🎯 EXTRACTION COMPLETE")
+    print(f"Successfully processed {len(test_incidents)} incident reports")
+    print("Check generated JSON files for full structured data\n")
@@ -0,0 +1,126 @@
+"""
+Day 3-4: Deadlines & Cancellation
+Learning: Give each request one overall time budget that covers prompt
+rendering, the Ollama call and every retry - and really cancel the
+generation (close the HTTP stream) when the budget runs out
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's time budget ran out (kept apart from parse failures)"""
+
+
+class Deadline:
+    """Absolute point in time by which a request must finish"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def allows(self, estimated_seconds: float) -> bool:
+        """Whether an attempt expected to take ``estimated_seconds`` still fits"""
+        return self.remaining() >= estimated_seconds
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline of {self.seconds:.1f}s exceeded")
+
+
+# ============================================================================
+# Cancellable invocation
+# ============================================================================
+
+# One long-lived event loop: OllamaLLM's async httpx client keeps pooled
+# connections bound to the loop it first ran on, so asyncio.run() per call
+# would break them
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="deadline-loop", daemon=True).start()
+    return _loop
+
+
+def invoke_with_deadline(runnable, inputs: Any, deadline: Optional[Deadline] = None,
+                         config: Optional[Dict[str, Any]] = None) -> Any:
+    """``runnable.invoke(inputs)`` that is cancelled when ``deadline`` passes.
+
+    The chain runs through ``ainvoke`` so that on timeout the task is
+    cancelled, which closes Ollama's HTTP stream and stops the generation
+    server-side instead of leaving it running in a thread.
+    """
+    if deadline is None:
+        return runnable.invoke(inputs, config=config)
+    deadline.check()
+
+    future = asyncio.run_coroutine_threadsafe(
+        runnable.ainvoke(inputs, config=config), _background_loop())
+    try:
+        return future.result(timeout=deadline.remaining())
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"Deadline of {deadline.seconds:.1f}s exceeded; generation cancelled") from None
+
+
+if __name__ == "__main__":
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_ollama import OllamaLLM
+
+    from fake_ollama import FakeOllamaServer
+    from fewshot_prompting import few_shot_prompt, test_incidents
+
+    print("=== DEADLINES: BULK RUN AGAINST A STRAGGLING BACKEND ===\n")
+    # 20% of generations are 40x slower than normal
+    with FakeOllamaServer(token_delay=0.005, straggler_rate=0.2, straggler_factor=40, seed=3) as fake:
+        chain = few_shot_prompt | OllamaLLM(model="command-r", base_url=fake.url) | StrOutputParser()
+        counts = {"ok": 0, "deadline_exceeded": 0, "failed": 0}
+        start = time.perf_counter()
+        for i in range(100):
+            deadline = Deadline(seconds=0.5)
+            try:
+                invoke_with_deadline(chain, {"incident": test_incidents[i % len(test_incidents)]}, deadline)
+                counts["ok"] += 1
+            except DeadlineExceeded:
+                counts["deadline_exceeded"] += 1
+            except Exception:
+                counts["failed"] += 1
+        elapsed = time.perf_counter() - start
+        time.sleep(0.2)  # let the server notice the closed connections
+
+        print(f"100 requests with a 0.5s deadline each, finished in {elapsed:.1f}s")
+        print(f"   ok: {counts['ok']} | deadline exceeded: {counts['deadline_exceeded']} | "
+              f"failed: {counts['failed']}")
+        print(f"   generations cancelled server-side: {fake.cancelled}\n")
+
+    print("=== DEADLINES: INCIDENT EXTRACTION WITH BUDGETED RETRIES ===\n")
+    from day3_4_exercise import safe_extract, test_incidents as reports
+
+    counts = {"ok": 0, "parse_failed": 0, "deadline_exceeded": 0}
+    for report in reports:
+        try:
+            result, success = safe_extract(report, deadline=Deadline(seconds=90))
+            counts["ok" if success else "parse_failed"] += 1
+        except DeadlineExceeded as e:
+            print(f"   ⏱️  {e}")
+            counts["deadline_exceeded"] += 1
+    print(f"\nok: {counts['ok']} | parse failures: {counts['parse_failed']} | "
+          f"deadline exceeded: {counts['deadline_exceeded']}")
+    print("\n" + "="*100 + "\n")
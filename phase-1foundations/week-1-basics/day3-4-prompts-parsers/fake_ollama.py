@@ -0,0 +1,196 @@
+"""
+Day 3-4: Fake Ollama Server
+Learning: A tiny local stand-in for `ollama serve` that speaks enough of the
+/api/generate protocol for OllamaLLM, with injectable stragglers and errors,
+so routing and resilience logic can be measured without a GPU
+"""
+
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_RESPONSE = (
+    "Priority: P2 (High)\nCategory: Performance Degradation\n"
+    "Action: Assign to performance team, investigate within 2 hours\n"
+    "Escalation: Manager if not resolved in 4 hours"
+)
+
+
+class FakeOllamaServer:
+    """Local fake Ollama endpoint running in a background thread.
+
+    Each response streams ``response_text`` word by word with
+    ``token_delay`` seconds between words. With probability
+    ``straggler_rate`` a request becomes a straggler and every word is
+    delayed ``straggler_factor`` times longer. With probability
+    ``error_rate`` a request fails with HTTP 503 ``error_message`` (what
+    Ollama returns while overloaded or reloading a model). All of these can
+    be changed while the server runs to inject faults.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        response_text: str = DEFAULT_RESPONSE,
+        token_delay: float = 0.005,
+        straggler_rate: float = 0.0,
+        straggler_factor: float = 20.0,
+        error_rate: float = 0.0,
+        error_message: str = "server busy, model is reloading",
+        seed: Optional[int] = None,
+    ):
+        self.response_text = response_text
+        self.token_delay = token_delay
+        self.straggler_rate = straggler_rate
+        self.straggler_factor = straggler_factor
+        self.error_rate = error_rate
+        self.error_message = error_message
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    def token_delay_for_request(self) -> float:
+        """Per-token delay for a new request (stragglers are much slower)"""
+        with self._lock:
+            self.requests += 1
+            straggler = self.random.random() < self.straggler_rate
+        return self.token_delay * (self.straggler_factor if straggler else 1.0)
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            failed = self.random.random() < self.error_rate
+            self.errors += failed
+        return failed
+
+    def generate(self, handler: BaseHTTPRequestHandler, body: dict) -> None:
+        delay = self.token_delay_for_request()
+        if self.should_fail():
+            payload = json.dumps({"error": self.error_message}).encode()
+            handler.send_response(503)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(payload)))
+            handler.end_headers()
+            handler.wfile.write(payload)
+            return
+        model = body.get("model", "command-r")
+        words = self.response_text.split(" ")
+        tokens = [w if i == len(words) - 1 else w + " " for i, w in enumerate(words)]
+        start = time.perf_counter_ns()
+
+        def line(payload: dict) -> bytes:
+            payload = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), **payload}
+            return (json.dumps(payload) + "\n").encode()
+
+        if not body.get("stream", True):
+            time.sleep(delay * len(tokens))
+            handler.send_response(200)
+            handler.send_header("Content-Type", "application/json")
+            handler.end_headers()
+            handler.wfile.write(line({"response": self.response_text, "done": True,
+                                      **self._stats(body, len(tokens), start)}))
+            with self._lock:
+                self.completed += 1
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(delay)
+                handler.wfile.write(line({"response": token, "done": False}))
+                handler.wfile.flush()
+            handler.wfile.write(line({"response": "", "done": True, "done_reason": "stop",
+                                      **self._stats(body, len(tokens), start)}))
+            handler.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-generation (e.g. a cancelled hedge)
+            with self._lock:
+                self.cancelled += 1
+            return
+        with self._lock:
+            self.completed += 1
+
+    @staticmethod
+    def _stats(body: dict, eval_count: int, start_ns: int) -> dict:
+        total = time.perf_counter_ns() - start_ns
+        return {
+            "context": [],
+            "total_duration": total,
+            "load_duration": 0,
+            "prompt_eval_count": max(1, len(body.get("prompt", "")) // 4),
+            "prompt_eval_duration": total // 10,
+            "eval_count": eval_count,
+            "eval_duration": total - total // 10,
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/api/generate":
+                    server.generate(self, body)
+                else:
+                    self.send_error(404)
+
+            def do_GET(self):
+                if self.path == "/api/version":
+                    payload = json.dumps({"version": "0.0.0-fake"}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass  # keep benchmark output readable
+
+        return Handler
+
+
+if __name__ == "__main__":
+    with FakeOllamaServer(port=11500) as fake:
+        print(f"Fake Ollama listening on {fake.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\nServed {fake.requests} requests ({fake.cancelled} cancelled)")
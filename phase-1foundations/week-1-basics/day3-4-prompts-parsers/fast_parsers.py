@@ -0,0 +1,275 @@
+"""
+Day 3-4: Fast-Path Output Parsing
+Learning: Find the JSON in an LLM response with one linear scan, repair the
+usual formatting slips, decode with orjson and validate with cached
+pydantic TypeAdapters - so a stray comma no longer costs a whole LLM retry
+"""
+
+import json
+import re
+import time
+from functools import lru_cache
+from typing import Any, List, Optional, Type
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
+from langchain_core.outputs import Generation
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import orjson
+
+    def _loads(text: str) -> Any:
+        return orjson.loads(text)
+except ImportError:  # orjson is in requirements.txt, but keep working without it
+    def _loads(text: str) -> Any:
+        return json.loads(text)
+
+# ============================================================================
+# Linear-scan JSON span finder + repair
+# ============================================================================
+
+_OPENERS = {"{": "}", "[": "]"}
+
+# Python-style literals that models sometimes emit instead of JSON ones
+_LITERALS = {"True": "true", "False": "false", "None": "null", "NaN": "null"}
+
+# One token per match; strings are consumed whole by the regex engine so the
+# Python loop only sees structure characters and bare words
+_TOKEN = re.compile(
+    r'(?P<string>"(?:[^"\\]|\\.)*")'
+    r'|(?P<unterminated>"(?:[^"\\]|\\.)*)'
+    r"|(?P<open>[{\[])"
+    r"|(?P<close>[}\]])"
+    r"|(?P<comma>,)"
+    r"|(?P<word>[A-Za-z_]\w*)"
+    r'|(?P<other>[^"{}\[\],A-Za-z_]+)',
+    re.S,
+)
+
+
+def repair_json(span: str) -> str:
+    """Repair common LLM JSON defects in a single pass.
+
+    ``span`` must start at the opening bracket. Fixes trailing commas,
+    Python literals, raw newlines inside strings and missing closing
+    brackets/quotes from truncated output, and drops anything after the
+    top-level value closes (trailing prose or a closing code fence).
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    pending_comma = None  # index in out of a comma not yet followed by a value
+
+    for match in _TOKEN.finditer(span):
+        kind, token = match.lastgroup, match.group()
+        if kind == "other":
+            out.append(token)
+            if token.strip():  # a number (or stray character) is a value too
+                pending_comma = None
+            continue
+        if kind == "close":
+            if pending_comma is not None:
+                out[pending_comma] = ""
+            if stack:
+                token = stack.pop()
+            out.append(token)
+            pending_comma = None
+            if not stack:
+                break
+            continue
+
+        pending_comma = None
+        if kind == "comma":
+            pending_comma = len(out)
+        elif kind == "open":
+            stack.append(_OPENERS[token])
+        elif kind == "string":
+            token = token.replace("\n", "\\n")
+        elif kind == "unterminated":
+            token = token.replace("\n", "\\n") + '"'
+        elif kind == "word":
+            token = _LITERALS.get(token, token)
+        out.append(token)
+
+    if stack:  # truncated output: close whatever is still open
+        if pending_comma is not None:
+            out[pending_comma] = ""
+        out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _span_start(text: str, opener: Optional[str]) -> int:
+    """Index of the outermost bracket to decode, or -1"""
+    obj, arr = text.find("{"), text.find("[")
+    if opener is not None:
+        return text.find(opener)
+    if obj < 0 or arr < 0:
+        return max(obj, arr)
+    if arr < obj and 0 <= text.find("]", arr) < obj:
+        return obj  # "Note [1]: {...}" - the array closes in the prose before the object
+    return min(obj, arr)
+
+
+def loads_tolerant(text: str, opener: Optional[str] = None) -> Any:
+    """Decode the outermost JSON object/array in ``text``.
+
+    Clean output (optionally wrapped in fences or prose) decodes straight
+    from the outermost bracket span; only when that fails is the span
+    repaired. Pass ``opener="{"`` when the caller expects an object. Nested
+    spans are never tried on their own, so a broken document raises
+    ValueError instead of decoding to one of its inner values.
+    """
+    start = _span_start(text, opener)
+    if start < 0:
+        raise ValueError("No JSON object found in output")
+    end = text.rfind(_OPENERS[text[start]])
+    if end > start:
+        try:
+            return _loads(text[start:end + 1])
+        except ValueError:
+            pass
+    try:
+        return _loads(repair_json(text[start:]))
+    except ValueError as e:
+        raise ValueError("Could not repair JSON in output") from e
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(schema: Type) -> TypeAdapter:
+    """Build each schema's validator once and reuse it for every parse"""
+    return TypeAdapter(schema)
+
+
+# ============================================================================
+# Drop-in LangChain parsers
+# ============================================================================
+
+class FastJsonOutputParser(JsonOutputParser):
+    """JsonOutputParser with tolerant repair and orjson decoding"""
+
+    def parse_result(self, result: List[Generation], *, partial: bool = False) -> Any:
+        if partial:  # streaming partial JSON keeps the stock behaviour
+            return super().parse_result(result, partial=True)
+        text = result[0].text
+        try:
+            return loads_tolerant(text, opener="{" if self.pydantic_object else None)
+        except ValueError as e:
+            raise OutputParserException(f"Invalid json output: {text}", llm_output=text) from e
+
+
+class FastPydanticOutputParser(PydanticOutputParser):
+    """PydanticOutputParser with tolerant repair and cached validators"""
+
+    def parse_result(self, result: List[Generation], *, partial: bool = False) -> Any:
+        if partial:
+            return super().parse_result(result, partial=True)
+        text = result[0].text
+        try:
+            obj = loads_tolerant(text, opener="{")
+        except ValueError as e:
+            raise OutputParserException(f"Invalid json output: {text}", llm_output=text) from e
+        try:
+            return get_type_adapter(self.pydantic_object).validate_python(obj)
+        except ValidationError as e:
+            name = self.pydantic_object.__name__
+            raise OutputParserException(
+                f"Failed to parse {name} from completion {text}. Got: {e}", llm_output=text
+            ) from e
+
+
+# ============================================================================
+# Microbenchmark: 100k synthetic LLM outputs
+# ============================================================================
+
+BENCH_OUTPUTS = 100_000
+# The stock parser takes ~40ms per output: time it on a sample and extrapolate
+STOCK_SAMPLE = 1_000
+
+
+def synthetic_outputs(records: List[dict], count: int) -> List[tuple]:
+    """(variant, text) pairs covering clean output and typical LLM slips"""
+    variants = {
+        "clean": lambda r: json.dumps(r),
+        "fenced": lambda r: f"```json\n{json.dumps(r, indent=2)}\n```",
+        "leading_prose": lambda r: f"Here is the extracted incident:\n{json.dumps(r, indent=2)}\nLet me know if you need more.",
+        "trailing_comma": lambda r: re.sub(r"\n(\s*)\]", r",\n\1]", json.dumps(r, indent=2), count=1),
+        "python_literals": lambda r: json.dumps(r, indent=2).replace("null", "None"),
+        "truncated": lambda r: json.dumps(r, indent=2).rstrip("}\n "),
+        "raw_newline": lambda r: json.dumps(r).replace(". ", ".\n", 1),
+    }
+    texts = [(name, make(record)) for name, make in variants.items() for record in records]
+    return [texts[i % len(texts)] for i in range(count)]
+
+
+# (text, expected) pairs the repair path has got wrong before
+REPAIR_CASES = [
+    ('{"scores": [1, 2, 3], "ok": True}', {"scores": [1, 2, 3], "ok": True}),
+    ('{"a": {"b": [1, 2', {"a": {"b": [1, 2]}}),
+    ('Note [1]: {"a": 1}', {"a": 1}),
+    ('{"ids": [7, 8,], "ratio": 0.5,}', {"ids": [7, 8], "ratio": 0.5}),
+    ('[{"a": 1}, {"b": None}]', [{"a": 1}, {"b": None}]),
+]
+
+
+def run_parser(parser, outputs: List[tuple]) -> tuple:
+    """Return (seconds, failures per variant)"""
+    failures = {}
+    start = time.perf_counter()
+    for variant, text in outputs:
+        try:
+            parser.parse(text)
+        except OutputParserException:
+            failures[variant] = failures.get(variant, 0) + 1
+    return time.perf_counter() - start, failures
+
+
+if __name__ == "__main__":
+    from day3_4_exercise import ProductionIncident
+
+    records = []
+    for path in ["incident_INC_2024_1987.json", "incident_INC_2024_2156.json"]:
+        with open(path) as f:
+            records.append(json.load(f))
+    outputs = synthetic_outputs(records, BENCH_OUTPUTS)
+
+    print("=== REPAIR CASES ===\n")
+    for text, expected in REPAIR_CASES:
+        try:
+            got = loads_tolerant(text)
+        except ValueError as e:
+            got = e
+        print(f"{'✅' if got == expected else '❌'} {text!r:<40} -> {got!r}")
+    print()
+
+    print("=== OUTPUT PARSER MICROBENCHMARK ===\n")
+    print(f"Synthetic outputs: {len(outputs):,} ProductionIncident responses\n")
+
+    # Outputs cycle through the variants, so the sample has the same mix
+    sample = outputs[:STOCK_SAMPLE]
+    stock_seconds, stock_failures = run_parser(PydanticOutputParser(pydantic_object=ProductionIncident), sample)
+    fast_seconds, fast_failures = run_parser(FastPydanticOutputParser(pydantic_object=ProductionIncident), outputs)
+    counts = {}
+    for variant, _ in outputs:
+        counts[variant] = counts.get(variant, 0) + 1
+    sample_counts = {}
+    for variant, _ in sample:
+        sample_counts[variant] = sample_counts.get(variant, 0) + 1
+
+    print(f"Stock parser timed on {len(sample):,} of them and extrapolated\n")
+    print(f"{'Variant':<18} {'Stock failures':>15} {'Fast failures':>15}")
+    for variant in sorted(counts):
+        stock_rate = stock_failures.get(variant, 0) / sample_counts[variant]
+        fast_rate = fast_failures.get(variant, 0) / counts[variant]
+        print(f"{variant:<18} {stock_rate:>15.0%} {fast_rate:>15.0%}")
+    print()
+
+    stock_rate = sum(stock_failures.values()) / len(sample)
+    fast_rate = sum(fast_failures.values()) / len(outputs)
+    stock_per_second = len(sample) / stock_seconds
+    fast_per_second = len(outputs) / fast_seconds
+    print(f"Stock parser: {stock_per_second:>10,.0f} outputs/s  "
+          f"(~{len(outputs) / stock_per_second / 60:.0f} min for all {len(outputs):,})")
+    print(f"Fast parser:  {fast_per_second:>10,.0f} outputs/s  ({fast_per_second / stock_per_second:.1f}x)")
+    print(f"LLM retries avoided: {stock_rate - fast_rate:.1%} of outputs "
+          f"(~{round((stock_rate - fast_rate) * len(outputs)):,} of {len(outputs):,})\n")
+    print("="*100 + "\n")
@@ -1,19 +1,34 @@
 """
 Day 3-4: Few-Shot Prompting
 Learning: Teaching LLMs by example
+
+The LLM, prompts and chains are built on first use (see lazy_registry.py),
+so importing this module stays cheap. Run one method with
+``python ../cli.py fewshot <technique>``.
 """
 
-from langchain_ollama import OllamaLLM
-from langchain_core.prompts import PromptTemplate, FewShotPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from lazy_registry import LazyRegistry
+
+lazy = LazyRegistry(__name__)
+__getattr__ = lazy.module_getattr
+
+
+@lazy
+def _llm():
+    from langchain_ollama import OllamaLLM
+    from llm_cassette import wrap_llm
+
+    # wrap_llm: set LLM_CASSETTE to record/replay responses offline (see llm_cassette.py)
+    return wrap_llm(OllamaLLM(model="command-r", temperature=0.5))
 
-llm = OllamaLLM(model="command-r", temperature=0.5)
+
+def _str_chain(prompt):
+    from langchain_core.output_parsers import StrOutputParser
+    return prompt | lazy.llm | StrOutputParser()
 
 # ============================================================================
 # METHOD 1: FewShotPromptTemplate
 # ============================================================================
-print("=== METHOD 1: FEWSHOTPROMPTTEMPLATE ===\n")
-
 # Define examples for incident classification
 examples = [
     {
@@ -35,10 +50,13 @@ examples = [
 ]
 
 # Create template for each example
-example_template = PromptTemplate(
-    input_variables=["incident", "classification"],
-    template="Incident: {incident}\nClassification:\n{classification}"
-)
+@lazy
+def _example_template():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["incident", "classification"],
+        template="Incident: {incident}\nClassification:\n{classification}"
+    )
 
 # Create the few-shot prompt template
 prefix = """You are an expert incident manager for a banking platform. 
@@ -47,16 +65,21 @@ Classify the following incidents using the same format as the examples below."""
 suffix = """Incident: {incident}
 Classification:"""
 
-few_shot_prompt = FewShotPromptTemplate(
-    examples=examples,
-    example_prompt=example_template,
-    prefix=prefix,
-    suffix=suffix,
-    input_variables=["incident"],
-    example_separator="\n\n---\n\n"
-)
+@lazy
+def _few_shot_prompt():
+    from langchain_core.prompts import FewShotPromptTemplate
+    return FewShotPromptTemplate(
+        examples=examples,
+        example_prompt=lazy.example_template,
+        prefix=prefix,
+        suffix=suffix,
+        input_variables=["incident"],
+        example_separator="\n\n---\n\n"
+    )
 
-chain = few_shot_prompt | llm | StrOutputParser()
+@lazy
+def _chain():
+    return _str_chain(lazy.few_shot_prompt)
 
 # Test with new incidents
 test_incidents = [
@@ -65,17 +88,9 @@ test_incidents = [
     "Scheduled maintenance notification email not sent to customers"
 ]
 
-for test_incident in test_incidents:
-    print(f"Test Incident: {test_incident}")
-    result = chain.invoke({"incident": test_incident})
-    print(f"Model Classification:\n{result}\n")
-    print("="*100 + "\n")
-
 # ============================================================================
 # METHOD 2: Dynamic Few-Shot (Banking Domain)
 # ============================================================================
-print("=== METHOD 2: DYNAMIC FEW-SHOT WITH DOMAIN EXPERTISE ===\n")
-
 # Examples for SLA impact calculation
 sla_examples = [
     {
@@ -118,10 +133,13 @@ SLA Calculation:
     }
 ]
 
-sla_example_template = PromptTemplate(
-    input_variables=["scenario", "calculation"],
-    template="Scenario: {scenario}\n{calculation}"
-)
+@lazy
+def _sla_example_template():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["scenario", "calculation"],
+        template="Scenario: {scenario}\n{calculation}"
+    )
 
 sla_prefix = """You are an SLA compliance analyst for a banking platform.
 Calculate SLA impact using the same methodology as these examples:"""
@@ -129,16 +147,21 @@ Calculate SLA impact using the same methodology as these examples:"""
 sla_suffix = """Scenario: {scenario}
 SLA Calculation:"""
 
-sla_few_shot = FewShotPromptTemplate(
-    examples=sla_examples,
-    example_prompt=sla_example_template,
-    prefix=sla_prefix,
-    suffix=sla_suffix,
-    input_variables=["scenario"],
-    example_separator="\n\n---\n\n"
-)
+@lazy
+def _sla_few_shot():
+    from langchain_core.prompts import FewShotPromptTemplate
+    return FewShotPromptTemplate(
+        examples=sla_examples,
+        example_prompt=lazy.sla_example_template,
+        prefix=sla_prefix,
+        suffix=sla_suffix,
+        input_variables=["scenario"],
+        example_separator="\n\n---\n\n"
+    )
 
-sla_chain = sla_few_shot | llm | StrOutputParser()
+@lazy
+def _sla_chain():
+    return _str_chain(lazy.sla_few_shot)
 
 # Test SLA calculations
 test_scenarios = [
@@ -146,17 +169,9 @@ test_scenarios = [
     "Wire transfer processing delayed: 3 hours, 50 high-value transactions ($10M total) pending"
 ]
 
-for scenario in test_scenarios:
-    print(f"Scenario: {scenario}\n")
-    result = sla_chain.invoke({"scenario": scenario})
-    print(f"SLA Analysis:\n{result}\n")
-    print("="*100 + "\n")
-
 # ============================================================================
 # METHOD 3: Format-Learning Few-Shot
 # ============================================================================
-print("=== METHOD 3: FORMAT-LEARNING FEW-SHOT ===\n")
-
 # Teach the model a specific output format
 format_examples = [
     {
@@ -173,25 +188,33 @@ format_examples = [
     }
 ]
 
-format_example_template = PromptTemplate(
-    input_variables=["input", "output"],
-    template="Input: {input}\nOutput: {output}"
-)
+@lazy
+def _format_example_template():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["input", "output"],
+        template="Input: {input}\nOutput: {output}"
+    )
 
 format_prefix = """Convert monitoring alerts into structured format following these examples:"""
 
 format_suffix = """Input: {input}
 Output:"""
 
-format_few_shot = FewShotPromptTemplate(
-    examples=format_examples,
-    example_prompt=format_example_template,
-    prefix=format_prefix,
-    suffix=format_suffix,
-    input_variables=["input"]
-)
+@lazy
+def _format_few_shot():
+    from langchain_core.prompts import FewShotPromptTemplate
+    return FewShotPromptTemplate(
+        examples=format_examples,
+        example_prompt=lazy.format_example_template,
+        prefix=format_prefix,
+        suffix=format_suffix,
+        input_variables=["input"]
+    )
 
-format_chain = format_few_shot | llm | StrOutputParser()
+@lazy
+def _format_chain():
+    return _str_chain(lazy.format_few_shot)
 
 test_alerts = [
     "CPU utilization exceeding normal range on payment servers",
@@ -199,9 +222,35 @@ test_alerts = [
     "Transaction reconciliation batch job timing out"
 ]
 
-for alert in test_alerts:
-    result = format_chain.invoke({"input": alert})
-    print(f"Alert: {alert}")
-    print(f"Structured: {result}\n")
+# Techniques runnable through ../cli.py
+TECHNIQUES = {
+    "classify": {"title": "METHOD 1: FEWSHOTPROMPTTEMPLATE", "chain": "chain",
+                 "inputs": [{"incident": i} for i in test_incidents]},
+    "sla": {"title": "METHOD 2: DYNAMIC FEW-SHOT WITH DOMAIN EXPERTISE", "chain": "sla_chain",
+            "inputs": [{"scenario": s} for s in test_scenarios]},
+    "format": {"title": "METHOD 3: FORMAT-LEARNING FEW-SHOT", "chain": "format_chain",
+               "inputs": [{"input": a} for a in test_alerts]},
+}
 
-print("="*100 + "\n")
+if __name__ == "__main__":
+    print("=== METHOD 1: FEWSHOTPROMPTTEMPLATE ===\n")
+    for test_incident in test_incidents:
+        print(f"Test Incident: {test_incident}")
+        result = lazy.chain.invoke({"incident": test_incident})
+        print(f"Model Classification:\n{result}\n")
+        print("="*100 + "\n")
+
+    print("=== METHOD 2: DYNAMIC FEW-SHOT WITH DOMAIN EXPERTISE ===\n")
+    for scenario in test_scenarios:
+        print(f"Scenario: {scenario}\n")
+        result = lazy.sla_chain.invoke({"scenario": scenario})
+        print(f"SLA Analysis:\n{result}\n")
+        print("="*100 + "\n")
+
+    print("=== METHOD 3: FORMAT-LEARNING FEW-SHOT ===\n")
+    for alert in test_alerts:
+        result = lazy.format_chain.invoke({"input": alert})
+        print(f"Alert: {alert}")
+        print(f"Structured: {result}\n")
+
+    print("="*100 + "\n")
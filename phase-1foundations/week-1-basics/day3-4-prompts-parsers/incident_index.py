@@ -0,0 +1,390 @@
+"""
+Day 3-4: Incident Retrieval Index
+Learning: "Find incidents like this one" over millions of extracted records -
+batch-embed title/description/root cause, keep vectors in a memory-mapped
+float32 matrix, and search an IVF index with int8-quantized codes, filtered
+by severity, category or date
+
+Usage:
+    python incident_index.py                       # benchmark, 1M vectors
+    python incident_index.py 200000 384            # smaller: count, dim
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+SEVERITIES = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+META_DTYPE = np.dtype([("severity", "u1"), ("category", "i4"), ("day", "i4"), ("list", "i4")])
+EPOCH = date(1970, 1, 1)
+
+
+def _day(value: date) -> int:
+    return (value - EPOCH).days
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def incident_text(incident: Any) -> str:
+    """What gets embedded for one ProductionIncident"""
+    return f"{incident.title}\n{incident.description}\nRoot cause: {incident.root_cause.primary_cause}"
+
+
+def kmeans(sample: np.ndarray, clusters: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on normalised vectors (cosine), returns centroids"""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=clusters) == 0
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class IncidentIndex:
+    """IVF + int8 scalar-quantized vector index stored in one directory.
+
+    - ``vectors.f32``: memory-mapped float32 matrix (exact re-ranking)
+    - ``codes.i8``:    memory-mapped int8 codes (fast approximate scoring)
+    - ``meta.u8``:     memory-mapped severity / category / day / IVF list
+    - ``index.json``:  size, centroids file, quantization scales, vocabularies
+
+    Call ``train()`` once on a representative sample, then ``add()`` in
+    batches. Queries score only the ``nprobe`` closest lists with the int8
+    codes, then re-rank the best candidates against the float32 vectors.
+    """
+
+    def __init__(self, directory: str, dim: Optional[int] = None, nlist: int = 1024, embeddings=None):
+        self.directory = directory
+        self.embeddings = embeddings
+        os.makedirs(directory, exist_ok=True)
+        state_path = os.path.join(directory, "index.json")
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                self.state = json.load(f)
+        else:
+            if dim is None:
+                raise ValueError("dim is required when creating a new index")
+            self.state = {"dim": dim, "nlist": nlist, "count": 0, "capacity": 0,
+                          "categories": [], "ids": "ids.jsonl", "trained": False}
+        self.dim = self.state["dim"]
+        self.centroids = self.scales = None
+        if self.state["trained"]:
+            self.centroids = np.load(os.path.join(directory, "centroids.npy"))
+            self.scales = np.load(os.path.join(directory, "scales.npy"))
+        self._open(self.state["capacity"])
+        self._postings = None  # (order, offsets) rebuilt after adds
+        self._ids = None  # row -> incident id, loaded on first use
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self, capacity: int) -> None:
+        self.vectors = self.codes = self.meta = None
+        if capacity == 0:
+            return
+        self.vectors = np.memmap(self._path("vectors.f32"), np.float32, "r+", shape=(capacity, self.dim))
+        self.codes = np.memmap(self._path("codes.i8"), np.int8, "r+", shape=(capacity, self.dim))
+        self.meta = np.memmap(self._path("meta.u8"), META_DTYPE, "r+", shape=(capacity,))
+
+    def reserve(self, rows: int) -> None:
+        """Grow the memory-mapped files to hold ``rows`` vectors"""
+        if rows > self.state["capacity"]:
+            self._resize(rows)
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self.state["capacity"]
+        if needed > capacity:
+            self._resize(max(needed, capacity * 2, 1024))
+
+    def _resize(self, new_capacity: int) -> None:
+        self.flush()
+        for name, itemsize in (("vectors.f32", 4 * self.dim), ("codes.i8", self.dim),
+                               ("meta.u8", META_DTYPE.itemsize)):
+            with open(self._path(name), "ab") as f:
+                f.truncate(new_capacity * itemsize)
+        self.state["capacity"] = new_capacity
+        self._open(new_capacity)
+
+    def flush(self) -> None:
+        for array in (self.vectors, self.codes, self.meta):
+            if array is not None:
+                array.flush()
+        with open(self._path("index.json"), "w") as f:
+            json.dump(self.state, f, indent=2)
+
+    def __len__(self) -> int:
+        return self.state["count"]
+
+    # ------------------------------------------------------------------
+    # Training and adding
+    # ------------------------------------------------------------------
+
+    def train(self, sample: np.ndarray, iterations: int = 10) -> None:
+        """Learn IVF centroids and per-dimension int8 scales from a sample"""
+        sample = _normalize(sample)
+        nlist = min(self.state["nlist"], len(sample))
+        self.centroids = kmeans(sample, nlist, iterations)
+        self.scales = (np.abs(sample).max(axis=0) / 127.0).astype(np.float32) + 1e-12
+        np.save(self._path("centroids.npy"), self.centroids)
+        np.save(self._path("scales.npy"), self.scales)
+        self.state.update(nlist=nlist, trained=True)
+        self.flush()
+
+    def _category_code(self, category: str) -> int:
+        categories = self.state["categories"]
+        if category not in categories:
+            categories.append(category)
+        return categories.index(category)
+
+    def add(self, vectors: np.ndarray, severities: Sequence[str], categories: Sequence[str],
+            dates: Sequence[date], ids: Optional[Sequence[str]] = None, chunk: int = 65536) -> None:
+        """Append a batch of embeddings with their filter metadata"""
+        if not self.state["trained"]:
+            raise RuntimeError("Call train() before add()")
+        start = self.state["count"]
+        self._ensure_capacity(start + len(vectors))
+        severity_codes = np.array([SEVERITIES.index(s.upper()) for s in severities], dtype=np.uint8)
+        category_codes = np.array([self._category_code(c) for c in categories], dtype=np.int32)
+        days = np.array([_day(d) for d in dates], dtype=np.int32)
+
+        for offset in range(0, len(vectors), chunk):
+            batch = _normalize(vectors[offset:offset + chunk])
+            rows = slice(start + offset, start + offset + len(batch))
+            self.vectors[rows] = batch
+            self.codes[rows] = np.clip(np.rint(batch / self.scales), -127, 127).astype(np.int8)
+            meta = self.meta[rows]
+            meta["severity"] = severity_codes[offset:offset + chunk]
+            meta["category"] = category_codes[offset:offset + chunk]
+            meta["day"] = days[offset:offset + chunk]
+            meta["list"] = np.argmax(batch @ self.centroids.T, axis=1)
+
+        if ids is not None:
+            with open(self._path(self.state["ids"]), "a") as f:
+                for row, incident_id in enumerate(ids, start):
+                    f.write(json.dumps({"row": row, "id": incident_id}) + "\n")
+        self.state["count"] = start + len(vectors)
+        self._postings = None
+        self._ids = None
+        self.flush()
+
+    def embed(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """Embed texts in batches (one embed_documents call per batch)"""
+        if self.embeddings is None:
+            from langchain_ollama import OllamaEmbeddings
+            self.embeddings = OllamaEmbeddings(model="nomic-embed-text")
+        batches = [self.embeddings.embed_documents(texts[i:i + batch_size])
+                   for i in range(0, len(texts), batch_size)]
+        return np.asarray([v for batch in batches for v in batch], dtype=np.float32)
+
+    def add_incidents(self, incidents: List[Any], dates: Optional[List[date]] = None,
+                      batch_size: int = 64) -> None:
+        """Embed and add extracted ProductionIncident records"""
+        vectors = self.embed([incident_text(i) for i in incidents], batch_size)
+        self.add(vectors,
+                 [i.severity for i in incidents],
+                 [i.category for i in incidents],
+                 dates or [date.today()] * len(incidents),
+                 [i.incident_id for i in incidents])
+
+    def ids(self) -> Dict[int, str]:
+        """Row -> incident id, read from disk once and cached until the next add()"""
+        if self._ids is None:
+            try:
+                with open(self._path(self.state["ids"])) as f:
+                    self._ids = {r["row"]: r["id"] for r in map(json.loads, f)}
+            except FileNotFoundError:
+                self._ids = {}
+        return self._ids
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _inverted_lists(self):
+        if self._postings is None:
+            lists = np.asarray(self.meta["list"][:len(self)])
+            order = np.argsort(lists, kind="stable").astype(np.int64)
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=len(self.centroids)))])
+            self._postings = (order, offsets)
+        return self._postings
+
+    def _filter(self, rows: np.ndarray, severity, category, date_from, date_to) -> np.ndarray:
+        if severity is None and category is None and date_from is None and date_to is None:
+            return rows
+        meta = self.meta[rows]
+        keep = np.ones(len(rows), dtype=bool)
+        if severity is not None:
+            wanted = [SEVERITIES.index(s.upper()) for s in ([severity] if isinstance(severity, str) else severity)]
+            keep &= np.isin(meta["severity"], wanted)
+        if category is not None:
+            categories = self.state["categories"]
+            names = [category] if isinstance(category, str) else category
+            keep &= np.isin(meta["category"], [categories.index(c) for c in names if c in categories])
+        if date_from is not None:
+            keep &= meta["day"] >= _day(date_from)
+        if date_to is not None:
+            keep &= meta["day"] <= _day(date_to)
+        return rows[keep]
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int = 16, rerank: int = 4,
+               severity=None, category=None, date_from: Optional[date] = None,
+               date_to: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Top-k rows by cosine similarity, optionally filtered.
+
+        Scores the ``nprobe`` nearest lists with int8 codes, keeps
+        ``k * rerank`` candidates and re-ranks them exactly. When a filter
+        leaves fewer than k candidates, nprobe is doubled until it does.
+        """
+        if not self.state["trained"]:
+            raise RuntimeError("Call train() and add() before search()")
+        if len(self) == 0:
+            return []
+        query = _normalize(query)
+        order, offsets = self._inverted_lists()
+        coarse = np.argsort(-(self.centroids @ query))
+        while True:
+            probed = coarse[:nprobe]
+            rows = np.concatenate([order[offsets[l]:offsets[l + 1]] for l in probed])
+            rows = self._filter(np.sort(rows), severity, category, date_from, date_to)
+            if len(rows) >= k or nprobe >= len(coarse):
+                break
+            nprobe *= 2
+
+        if len(rows) == 0:
+            return []
+        approx = self.codes[rows].astype(np.float32) @ (query * self.scales)
+        keep = min(len(rows), k * rerank)
+        shortlist = rows[np.argpartition(-approx, keep - 1)[:keep]]
+        exact = self.vectors[shortlist] @ query
+        best = np.argsort(-exact)[:k]
+        categories = self.state["categories"]
+        results = []
+        for row, score in zip(shortlist[best], exact[best]):
+            meta = self.meta[row]
+            results.append({"row": int(row), "score": float(score),
+                            "severity": SEVERITIES[meta["severity"]],
+                            "category": categories[meta["category"]],
+                            "date": date.fromordinal(EPOCH.toordinal() + int(meta["day"]))})
+        return results
+
+    def search_text(self, text: str, k: int = 10, **kwargs: Any) -> List[Dict[str, Any]]:
+        if self.embeddings is None:
+            self.embed([text])  # creates the default embeddings
+        ids = self.ids()
+        results = self.search(np.asarray(self.embeddings.embed_query(text), dtype=np.float32), k, **kwargs)
+        for result in results:
+            result["incident_id"] = ids.get(result["row"])
+        return results
+
+    def exact_search(self, query: np.ndarray, k: int = 10, chunk: int = 262144) -> np.ndarray:
+        """Brute-force top-k rows over the float32 matrix (ground truth)"""
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+        query = _normalize(query)
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), chunk):
+            end = min(start + chunk, len(self))
+            scores[start:end] = self.vectors[start:end] @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+
+# ============================================================================
+# Benchmark: recall and latency at 1M vectors on CPU
+# ============================================================================
+
+def synthetic_vectors(count: int, dim: int, topics: int, seed: int, spread: float = 1.2,
+                      chunk: int = 100_000) -> Iterable[np.ndarray]:
+    """Clustered unit vectors, like embeddings of recurring incident types.
+
+    Topic centres are fixed (same for data and queries); ``seed`` only picks
+    topics and noise. ``spread`` is the noise norm relative to the centre.
+    """
+    centers = _normalize(np.random.default_rng(0).standard_normal((topics, dim)))
+    rng = np.random.default_rng(seed)
+    noise = spread / np.sqrt(dim)
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        topic = rng.integers(0, topics, size)
+        yield _normalize(centers[topic] + noise * rng.standard_normal((size, dim)).astype(np.float32))
+
+
+if __name__ == "__main__":
+    import shutil
+    import tempfile
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    dim = int(sys.argv[2]) if len(sys.argv) > 2 else 768  # nomic-embed-text
+    nlist = int(np.sqrt(count))
+    topics = max(count // 100, 10)  # ~100 near-duplicates per incident type
+    queries = 100
+    directory = tempfile.mkdtemp(prefix="incident_index_")
+    rng = np.random.default_rng(7)
+    categories = ["Payment System Issue", "Performance Degradation", "Data Issue", "Service Outage", "Security"]
+
+    try:
+        print(f"=== INCIDENT INDEX: {count:,} x {dim} float32 on CPU ({directory}) ===\n")
+        index = IncidentIndex(directory, dim=dim, nlist=nlist)
+        index.reserve(count)
+        start = time.perf_counter()
+        sample = np.concatenate(list(synthetic_vectors(min(count, 100_000), dim, topics=topics, seed=1)))
+        index.train(sample, iterations=8)
+        print(f"Trained {index.state['nlist']} IVF lists in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        for batch in synthetic_vectors(count, dim, topics=topics, seed=2):
+            days = rng.integers(_day(date(2019, 1, 1)), _day(date(2025, 1, 1)), len(batch))
+            index.add(batch,
+                      rng.choice(SEVERITIES, len(batch), p=[0.4, 0.3, 0.2, 0.1]),
+                      rng.choice(categories, len(batch)),
+                      [date.fromordinal(EPOCH.toordinal() + int(d)) for d in days])
+        print(f"Added {len(index):,} vectors in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(index._path('vectors.f32')) / 1e9:.2f} GB float32 + "
+              f"{os.path.getsize(index._path('codes.i8')) / 1e9:.2f} GB int8, memory-mapped)\n")
+
+        query_vectors = next(synthetic_vectors(queries, dim, topics=topics, seed=3))
+        start = time.perf_counter()
+        truth = [set(index.exact_search(q, 10).tolist()) for q in query_vectors]
+        exact_ms = (time.perf_counter() - start) / queries * 1000
+        print(f"Exact scan: {exact_ms:.1f}ms per query\n")
+
+        print(f"{'nprobe':>6} {'recall@10':>10} {'p50':>9} {'p95':>9}")
+        for nprobe in (1, 4, 8, 16, 32, 64):
+            latencies, hits = [], 0
+            for q, expected in zip(query_vectors, truth):
+                start = time.perf_counter()
+                found = index.search(q, k=10, nprobe=nprobe)
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len(expected & {r["row"] for r in found})
+            print(f"{nprobe:>6} {hits / (10 * queries):>10.1%} {np.percentile(latencies, 50):>7.2f}ms "
+                  f"{np.percentile(latencies, 95):>7.2f}ms")
+
+        print("\nFiltered: severity=CRITICAL, since 2024-01-01, nprobe=16")
+        latencies = []
+        for q in query_vectors:
+            start = time.perf_counter()
+            found = index.search(q, k=10, nprobe=16, severity="CRITICAL", date_from=date(2024, 1, 1))
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert all(r["severity"] == "CRITICAL" and r["date"] >= date(2024, 1, 1) for r in found)
+        print(f"   p50 {np.percentile(latencies, 50):.2f}ms | p95 {np.percentile(latencies, 95):.2f}ms")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print("\n" + "="*100 + "\n")
@@ -0,0 +1,229 @@
+"""
+Day 3-4: Incremental Re-extraction
+Learning: When an incident report is edited, diff it against the version
+already extracted, re-run only the sub-models whose sections changed, and
+merge them into the stored record
+"""
+
+import difflib
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableParallel
+from pydantic import BaseModel
+
+from day3_4_exercise import ProductionIncident, test_incidents
+from sectioned_extraction import (
+    PART_MODELS,
+    IncidentHeader,
+    build_part_prompt,
+    group_sections,
+    map_chain,
+    part_chains,
+    reduce_parts,
+    split_sections,
+)
+from token_accounting import TokenAccountant
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+INCIDENT_ID_PATTERN = re.compile(r"INC-\d{4}-\d+")
+
+
+class UpdateResult(BaseModel):
+    """What one update re-extracted and what it saved"""
+    incident_id: str
+    changed_sections: List[str]
+    reextracted_parts: List[str]
+    skipped_parts: List[str]
+    tokens_used: int
+    tokens_saved: int
+    """Estimated prompt + output tokens of the skipped parts"""
+    seconds: float
+
+
+class IncidentStore:
+    """Last extracted report text + incident per id, one JSON file each"""
+
+    def __init__(self, directory: str = os.path.join(HERE, "incident_store")):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, incident_id: str) -> str:
+        return os.path.join(self.directory, f"{incident_id.replace('-', '_')}.json")
+
+    def load(self, incident_id: str) -> Optional[Tuple[str, ProductionIncident]]:
+        try:
+            with open(self._path(incident_id)) as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            return None
+        return record["report_text"], ProductionIncident(**record["incident"])
+
+    def save(self, incident_id: str, report_text: str, incident: ProductionIncident) -> None:
+        with open(self._path(incident_id), "w") as f:
+            json.dump({"report_text": report_text, "incident": incident.model_dump(),
+                       "updated_at": time.time()}, f, indent=2)
+
+
+# ============================================================================
+# Diff -> changed parts
+# ============================================================================
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def changed_sections(old_text: str, new_text: str) -> List[str]:
+    """Names of sections that were added, removed or edited (whitespace ignored)"""
+    old = {s["name"]: _normalize(s["text"]) for s in split_sections(old_text)}
+    new = {s["name"]: _normalize(s["text"]) for s in split_sections(new_text)}
+    return [name for name in dict.fromkeys([*old, *new]) if old.get(name) != new.get(name)]
+
+
+def changed_parts(old_text: str, new_text: str) -> List[str]:
+    """Sub-models whose input text differs between the two versions.
+
+    Compares the grouped per-part inputs: an IMPACT edit touches
+    impact_metrics and the header (which also reads the impact sections),
+    and a header edit touches the header and impact_metrics (which also
+    reads the header prose, where figures are often stated).
+    """
+    old = group_sections(old_text, split_sections(old_text))
+    new = group_sections(new_text, split_sections(new_text))
+    return [part for part in PART_MODELS if _normalize(old[part]) != _normalize(new[part])]
+
+
+def split_incident(incident: ProductionIncident) -> Dict[str, BaseModel]:
+    """Inverse of reduce_parts: the stored incident as per-part models"""
+    header_fields = IncidentHeader.model_fields
+    return {
+        "header": IncidentHeader(**{k: v for k, v in incident.model_dump().items() if k in header_fields}),
+        "impact_metrics": incident.impact_metrics,
+        "root_cause": incident.root_cause,
+        "resolution": incident.resolution,
+    }
+
+
+# ============================================================================
+# Incremental update
+# ============================================================================
+
+_part_prompts = {part: build_part_prompt(part)[0] for part in PART_MODELS}
+
+
+def skipped_tokens(accountant: TokenAccountant, grouped: Dict[str, str],
+                   stored_parts: Dict[str, BaseModel], skipped: List[str]) -> int:
+    """Tokens a full re-extraction would have spent on the skipped parts"""
+    total = 0
+    for part in skipped:
+        prompt_text = _part_prompts[part].format(section_text=grouped[part])
+        total += accountant.count_tokens(prompt_text)
+        total += accountant.count_tokens(stored_parts[part].model_dump_json())
+    return total
+
+
+def update_incident(report_text: str, store: IncidentStore,
+                    accountant: Optional[TokenAccountant] = None,
+                    max_concurrency: int = 4) -> Tuple[ProductionIncident, UpdateResult]:
+    """Extract a new or edited report, re-running only the parts that changed"""
+    accountant = accountant or TokenAccountant()
+    start = time.perf_counter()
+    records_before = len(accountant.records)
+    config = {"callbacks": [accountant], "metadata": {"chain": "incremental_extraction"},
+              "max_concurrency": max_concurrency}
+
+    match = INCIDENT_ID_PATTERN.search(report_text)
+    previous = store.load(match.group(0)) if match else None
+
+    if previous is None:
+        sections = [s["name"] for s in split_sections(report_text)]
+        grouped = group_sections(report_text, split_sections(report_text))
+        incident = reduce_parts(map_chain.invoke(grouped, config=config))
+        incident_id, reextracted, skipped, saved = incident.incident_id, list(PART_MODELS), [], 0
+    else:
+        old_text, stored = previous
+        incident_id = stored.incident_id
+        sections = changed_sections(old_text, report_text)
+        reextracted = changed_parts(old_text, report_text)
+        skipped = [part for part in PART_MODELS if part not in reextracted]
+
+        grouped = group_sections(report_text, split_sections(report_text))
+        parts = split_incident(stored)
+        if reextracted:
+            fresh = RunnableParallel({
+                part: (lambda g, part=part: {"section_text": g[part]})
+                | part_chains[part].with_retry(stop_after_attempt=2)
+                for part in reextracted
+            }).invoke(grouped, config=config)
+            parts.update(fresh)
+        incident = reduce_parts(parts) if reextracted else stored
+        saved = skipped_tokens(accountant, grouped, parts, skipped)
+
+    store.save(incident_id, report_text, incident)
+    used = sum((r.prompt_eval_count or r.estimated_prompt_tokens) + (r.eval_count or 0)
+               for r in accountant.records[records_before:])
+    return incident, UpdateResult(
+        incident_id=incident_id,
+        changed_sections=sections,
+        reextracted_parts=reextracted,
+        skipped_parts=skipped,
+        tokens_used=used,
+        tokens_saved=saved,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def print_update(result: UpdateResult) -> None:
+    print(f"   changed sections:  {', '.join(result.changed_sections) or '-'}")
+    print(f"   re-extracted:      {', '.join(result.reextracted_parts) or '-'}")
+    print(f"   skipped:           {', '.join(result.skipped_parts) or '-'}")
+    print(f"   tokens used:       {result.tokens_used:,} | saved: ~{result.tokens_saved:,} "
+          f"| {result.seconds:.1f}s\n")
+
+
+if __name__ == "__main__":
+    store = IncidentStore()
+    accountant = TokenAccountant()
+    original = test_incidents[1]  # INC-2024-2156
+
+    # Seed the store from the saved extraction instead of paying for it again
+    saved_path = os.path.join(HERE, "incident_INC_2024_2156.json")
+    if os.path.exists(saved_path) and store.load("INC-2024-2156") is None:
+        with open(saved_path) as f:
+            store.save("INC-2024-2156", original, ProductionIncident(**json.load(f)))
+
+    print("=== INITIAL EXTRACTION (or stored version) ===\n")
+    incident, result = update_incident(original, store, accountant)
+    print_update(result)
+
+    print("=== UPDATE 1: ROOT CAUSE REVISED ===\n")
+    revised = original.replace(
+        "transaction volume. Database locks cascaded to dependent services.",
+        "transaction volume. Database locks cascaded to dependent services.\n"
+        "    Follow-up RCA: lock escalation was triggered by a missing index on the\n"
+        "    sanctions_entities table introduced in release 4.8.",
+    )
+    for line in difflib.unified_diff(original.splitlines(), revised.splitlines(), lineterm="", n=0):
+        if line[:1] in "+-" and not line.startswith(("+++", "---")):
+            print(f"   {line.strip()}")
+    print()
+    incident, result = update_incident(revised, store, accountant)
+    print_update(result)
+    print(f"   root_cause: {incident.root_cause.model_dump_json(indent=2)}\n")
+
+    print("=== UPDATE 2: NEW PERMANENT FIX ===\n")
+    revised_again = revised.replace(
+        "6. Regulatory reporting automation for breach notifications",
+        "6. Regulatory reporting automation for breach notifications\n"
+        "    7. Add index on sanctions_entities(entity_id, list_version)",
+    )
+    incident, result = update_incident(revised_again, store, accountant)
+    print_update(result)
+
+    print("=== UPDATE 3: WHITESPACE ONLY ===\n")
+    incident, result = update_incident(revised_again.replace("\n\n", "\n \n"), store, accountant)
+    print_update(result)
+    print("="*100 + "\n")
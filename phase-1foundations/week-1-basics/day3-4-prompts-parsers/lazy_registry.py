@@ -0,0 +1,55 @@
+"""
+Day 3-4: Lazy Module Objects
+Learning: Build LLMs, prompts and chains the first time they are used, so
+importing a tutorial module (or listing its techniques) stays cheap
+
+Usage in a module:
+    lazy = LazyRegistry(__name__)
+
+    @lazy
+    def _chain():
+        return lazy.prompt | lazy.llm | StrOutputParser()
+
+    __getattr__ = lazy.module_getattr   # `from module import chain` still works
+"""
+
+import threading
+from typing import Any, Callable, Dict, List
+
+
+class LazyRegistry:
+    """Objects a module builds on first access.
+
+    Decorate a zero-argument builder named ``_<name>``; ``lazy.<name>`` (or
+    ``module.<name>`` through ``module_getattr``) calls it once and caches
+    the result. The leading underscore keeps the builder itself from
+    shadowing the public name in the module namespace.
+    """
+
+    def __init__(self, module_name: str):
+        self.module_name = module_name
+        self._builders: Dict[str, Callable[[], Any]] = {}
+        self._built: Dict[str, Any] = {}
+        self._lock = threading.RLock()  # builders may read other lazy objects
+
+    def __call__(self, builder: Callable[[], Any]) -> Callable[[], Any]:
+        if not builder.__name__.startswith("_"):
+            raise ValueError(f"Lazy builder {builder.__name__!r} must be named _<object name>")
+        self._builders[builder.__name__[1:]] = builder
+        return builder
+
+    def __getattr__(self, name: str) -> Any:
+        builders = self.__dict__.get("_builders", {})
+        if name not in builders:
+            raise AttributeError(f"module {self.module_name!r} has no attribute {name!r}")
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = builders[name]()
+            return self._built[name]
+
+    def module_getattr(self, name: str) -> Any:
+        """Use as the module's ``__getattr__`` (PEP 562)"""
+        return getattr(self, name)
+
+    def names(self) -> List[str]:
+        return list(self._builders)
@@ -0,0 +1,218 @@
+"""
+Day 3-4: Record/Replay LLM
+Learning: Record real Ollama responses once (with streaming chunk timings and
+metadata), then replay them offline - instantly or at the original speed -
+to iterate on parsers and load-test batching without touching the model
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseLLM
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from pydantic import PrivateAttr
+
+# OllamaLLM fields that change the response and therefore belong in the key
+OPTION_FIELDS = [
+    "temperature", "num_ctx", "num_predict", "top_k", "top_p", "repeat_penalty",
+    "repeat_last_n", "mirostat", "mirostat_eta", "mirostat_tau", "tfs_z", "format",
+]
+
+# generation_info fields not worth storing: Ollama's "context" is the full
+# token-id array of prompt + output, larger than the text itself
+DROPPED_INFO = ("context",)
+
+MODES = ("record", "replay", "auto")
+
+
+class CassetteLLM(BaseLLM):
+    """Record/replay wrapper around an OllamaLLM (or any BaseLLM).
+
+    The cassette is a JSON Lines file, one request per line, indexed in
+    memory by a hash of (model, options, prompt, stop, call kwargs) on load.
+
+    Modes:
+      record - always call the wrapped LLM and append the response
+      replay - serve only from the cassette; a missing entry is an error
+      auto   - replay when recorded, otherwise record
+    """
+    llm: BaseLLM
+    cassette_path: str
+    mode: str = "replay"
+    replay_speed: Optional[float] = None
+    """None replays instantly; 1.0 reproduces the recorded chunk timing"""
+
+    _index: Dict[str, dict] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {self.mode!r}")
+        if os.path.exists(self.cassette_path):
+            with open(self.cassette_path) as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._index[record["key"]] = record
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    # ------------------------------------------------------------------
+    # Request key
+    # ------------------------------------------------------------------
+
+    def request(self, prompt: str, stop: Optional[List[str]] = None, **kwargs: Any) -> dict:
+        """The parts of a call that determine its response.
+
+        ``kwargs`` are call-time options (e.g. ``llm.invoke(p, temperature=0)``)
+        and are keyed as well, so they never replay another call's recording.
+        """
+        return {
+            "model": getattr(self.llm, "model", self.llm._llm_type),
+            "options": {f: getattr(self.llm, f, None) for f in OPTION_FIELDS},
+            "prompt": prompt,
+            "stop": stop,
+            "kwargs": kwargs,
+        }
+
+    @staticmethod
+    def request_key(request: dict) -> str:
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    # ------------------------------------------------------------------
+    # LLM interface
+    # ------------------------------------------------------------------
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[GenerationChunk]:
+        request = self.request(prompt, stop, **kwargs)
+        key = self.request_key(request)
+        record = self._index.get(key)
+
+        if self.mode == "record" or (self.mode == "auto" and record is None):
+            chunks = self._record(key, request)
+        elif record is None:
+            raise KeyError(
+                f"No cassette entry for this request (key {key[:12]}) in {self.cassette_path}; "
+                "re-run in 'record' or 'auto' mode"
+            )
+        else:
+            chunks = self._replay(record)
+
+        for chunk in chunks:
+            if run_manager and chunk.text:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        generations = []
+        for prompt in prompts:
+            final = None
+            for chunk in self._stream(prompt, stop=stop, run_manager=run_manager, **kwargs):
+                final = chunk if final is None else final + chunk
+            final = final or GenerationChunk(text="")
+            generations.append([Generation(text=final.text, generation_info=final.generation_info)])
+        return LLMResult(generations=generations)
+
+    # ------------------------------------------------------------------
+    # Record / replay
+    # ------------------------------------------------------------------
+
+    def _record(self, key: str, request: dict) -> Iterator[GenerationChunk]:
+        start = time.perf_counter()
+        chunks = []
+        generation_info = None
+        for chunk in self.llm._stream(request["prompt"], stop=request["stop"], **request["kwargs"]):
+            chunks.append([round(time.perf_counter() - start, 4), chunk.text])
+            if chunk.generation_info:
+                generation_info = {k: v for k, v in chunk.generation_info.items() if k not in DROPPED_INFO}
+            yield chunk
+
+        record = {"key": key, **request, "chunks": chunks, "generation_info": generation_info}
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._index[key] = record
+            with open(self.cassette_path, "a") as f:
+                f.write(line + "\n")
+
+    def _replay(self, record: dict) -> Iterator[GenerationChunk]:
+        start = time.perf_counter()
+        last = len(record["chunks"]) - 1
+        for i, (offset, text) in enumerate(record["chunks"]):
+            if self.replay_speed:
+                delay = start + offset / self.replay_speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            info = record["generation_info"] if i == last else None
+            yield GenerationChunk(text=text, generation_info=info)
+
+
+def wrap_llm(llm: BaseLLM) -> BaseLLM:
+    """Wrap ``llm`` in a CassetteLLM when LLM_CASSETTE is set.
+
+    LLM_CASSETTE=incidents.cassette.jsonl LLM_CASSETTE_MODE=record python day3_4_exercise.py
+    LLM_CASSETTE=incidents.cassette.jsonl python day3_4_exercise.py   # offline replay
+    LLM_CASSETTE_SPEED=1.0 replays with the recorded timing.
+    """
+    cassette_path = os.environ.get("LLM_CASSETTE")
+    if not cassette_path:
+        return llm
+    speed = os.environ.get("LLM_CASSETTE_SPEED")
+    return CassetteLLM(
+        llm=llm,
+        cassette_path=cassette_path,
+        mode=os.environ.get("LLM_CASSETTE_MODE", "replay"),
+        replay_speed=float(speed) if speed else None,
+    )
+
+
+if __name__ == "__main__":
+    # python llm_cassette.py record   -> record the few-shot demo against Ollama
+    # python llm_cassette.py          -> load-test the recorded cassette offline
+    from langchain_core.output_parsers import StrOutputParser
+    from fewshot_prompting import llm as ollama_llm, few_shot_prompt, test_incidents
+
+    cassette = "fewshot.cassette.jsonl"
+    mode = sys.argv[1] if len(sys.argv) > 1 else "replay"
+
+    if mode == "record":
+        recorder = CassetteLLM(llm=ollama_llm, cassette_path=cassette, mode="record")
+        chain = few_shot_prompt | recorder | StrOutputParser()
+        for incident in test_incidents:
+            start = time.perf_counter()
+            chain.invoke({"incident": incident})
+            print(f"Recorded in {time.perf_counter() - start:.1f}s: {incident}")
+        print(f"\nCassette written to {cassette}\n")
+        sys.exit(0)
+
+    print("=== OFFLINE REPLAY LOAD TEST ===\n")
+    inputs = [{"incident": test_incidents[i % len(test_incidents)]} for i in range(1000)]
+    for label, speed in [("instant", None), ("original timing", 1.0)]:
+        replayer = CassetteLLM(llm=ollama_llm, cassette_path=cassette, mode="replay", replay_speed=speed)
+        chain = few_shot_prompt | replayer | StrOutputParser()
+        batch = inputs if speed is None else inputs[:16]
+        start = time.perf_counter()
+        chain.batch(batch, config={"max_concurrency": 16})
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<16} {len(batch):>5} calls in {elapsed:6.2f}s ({len(batch) / elapsed:,.0f} calls/s)")
+    print("\n" + "="*100 + "\n")
@@ -0,0 +1,277 @@
+"""
+Day 3-4: Numeric Pre-extraction
+Learning: Numbers stated explicitly in a report ("3,500 users affected",
+"$250,000", "SLA breached by 90 minutes") can be pulled with compiled
+regexes in microseconds instead of being generated token by token - then
+either fill ImpactMetrics directly (shrinking the LLM schema) or go into
+the prompt as hints for the LLM to check
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+IMPACT_FIELDS = (
+    "affected_user_count",
+    "failed_transactions",
+    "revenue_impact_usd",
+    "customer_complaints",
+    "sla_breach_minutes",
+)
+
+# ============================================================================
+# Compiled patterns
+# ============================================================================
+
+# "3,500", "1500", "45.7" plus an optional magnitude ("45.7 million", "$180K")
+_NUM = r"(?<![\d.,$])(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k|m|mm|thousand|million|bn|billion)?\b"
+_MONEY = r"(?:\$|usd\s*)\s*(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k|m|mm|thousand|million|bn|billion)?\b"
+# "135 minutes", "3.5 hours", and compounds "2 hours 15 minutes" / "2h15m"
+_DURATION = (r"(?<![\d.])(\d+(?:\.\d+)?)\s*(minutes?|mins?|hours?|hrs?|h|m)(?:\b|(?=\d))"
+             r"(?:\s*(?:and\s+)?(\d+)\s*(minutes?|mins?|m)\b)?")
+# Not the denominator of a ratio ("1 in 5 users", "3 out of 10 customers")
+_NOT_RATIO = r"(?<!\bin\s)(?<!\bof\s)"
+_WORDS = r"(?:[a-z][a-z-]*\s+){0,3}"
+_PAREN = r"(?:\([^)]{0,60}\)\s*)?"
+
+# Per field: patterns tried in order, first match wins
+PATTERNS = {
+    "affected_user_count": [
+        rf"(?:affected|impacted)\s+(?:users|customers|clients)\s*[:=]\s*{_NUM}",
+        rf"{_NOT_RATIO}{_NUM}\+?\s+{_WORDS}(?:users?|customers?|clients?|account\s*holders?)\b",
+    ],
+    "failed_transactions": [
+        rf"failed\s+(?:transactions?|payments?|transfers?)\s*[:=]\s*{_NUM}",
+        rf"{_NUM}\s+failed\s+(?:transactions?|payments?|transfers?)",
+        rf"{_NUM}\s+{_WORDS}(?:transactions?|payments?|transfers?)\s+{_PAREN}(?:failed|declined|rejected|stuck)",
+    ],
+    "revenue_impact_usd": [
+        rf"(?:revenue|financial|business)\s+(?:impact|loss)[^$\n]{{0,40}}?{_MONEY}",
+        rf"{_MONEY}\s+(?:in\s+)?(?:lost\s+)?revenue",
+        r"\b(?:zero|no)\s+(?:direct\s+)?revenue\s+impact",
+    ],
+    "customer_complaints": [
+        rf"complaints?\s*[:=]\s*{_NUM}",
+        rf"{_NOT_RATIO}{_NUM}\+?\s+{_WORDS}(?:complaints?|support\s+tickets?|escalations?|calls?)\b",
+    ],
+    "sla_breach_minutes": [
+        rf"\bsla\b[^\n]{{0,80}}?breach(?:ed)?\s+(?:by|for|of)\s+(?:approximately\s+|about\s+)?{_DURATION}",
+        rf"breach\s+(?:that\s+)?lasted\s+(?:approximately\s+|about\s+)?{_DURATION}",
+        rf"incident\s+consumed\s+{_DURATION}",
+    ],
+}
+
+COMPILED = {
+    field: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    for field, patterns in PATTERNS.items()
+}
+
+# Phrasings the patterns must get right (or leave to the LLM, as None),
+# since a prefilled value is never checked by the model
+PHRASING_CASES = [
+    ("SLA breached by 2 hours 15 minutes.", "sla_breach_minutes", 135.0),
+    ("SLA breached by 2h15m during the peak.", "sla_breach_minutes", 135.0),
+    ("SLA breached by 1 hour and 5 minutes.", "sla_breach_minutes", 65.0),
+    ("SLA breached by 3.5 hours.", "sla_breach_minutes", 210.0),
+    ("The outage affected 1 in 5 users.", "affected_user_count", None),
+    ("3 out of 10 customers could not log in.", "affected_user_count", None),
+    ("Roughly 1,200 customers could not log in.", "affected_user_count", 1200.0),
+]
+
+_MAGNITUDE = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "million": 1e6, "bn": 1e9, "billion": 1e9}
+
+
+def _number(digits: str, magnitude: Optional[str]) -> float:
+    return float(digits.replace(",", "")) * _MAGNITUDE.get((magnitude or "").lower(), 1.0)
+
+
+def _minutes(amount: str, unit: str, extra: Optional[str] = None, extra_unit: Optional[str] = None) -> float:
+    minutes = float(amount) * (60.0 if unit.lower().startswith("h") else 1.0)
+    return minutes + (float(extra) if extra else 0.0)
+
+
+def extract_metrics(text: str) -> Dict[str, Tuple[float, str]]:
+    """Field -> (normalised value, matched text) for every metric found.
+
+    Counts and dollar amounts are normalised to plain numbers ("$180K" ->
+    180000.0) and durations to minutes ("3.5 hours" -> 210.0).
+    """
+    found = {}
+    for field, patterns in COMPILED.items():
+        for pattern in patterns:
+            match = pattern.search(text)
+            if not match:
+                continue
+            if not match.groups():
+                value = 0.0  # "zero revenue impact"
+            elif field == "sla_breach_minutes":
+                value = _minutes(*match.groups()[-4:])
+            else:
+                value = _number(*match.groups()[-2:])
+            found[field] = (value, " ".join(match.group(0).split()))
+            break
+    return found
+
+
+def as_impact_values(found: Dict[str, Tuple[float, str]]) -> Dict[str, Any]:
+    """Values typed like ImpactMetrics (ints for counts and minutes)"""
+    return {field: (value if field == "revenue_impact_usd" else int(round(value)))
+            for field, (value, _) in found.items()}
+
+
+# ============================================================================
+# Mode 1: fill ImpactMetrics directly, shrink the LLM schema
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def shrunk_schema(missing: Tuple[str, ...]):
+    """ProductionIncident without the impact fields the regexes already found"""
+    from pydantic import create_model
+    from day3_4_exercise import ImpactMetrics, ProductionIncident
+
+    fields = {name: (info.annotation, info) for name, info in ProductionIncident.model_fields.items()
+              if name != "impact_metrics"}
+    if missing:
+        remaining = create_model(
+            "ImpactMetrics",
+            __doc__=ImpactMetrics.__doc__,
+            **{name: (ImpactMetrics.model_fields[name].annotation, ImpactMetrics.model_fields[name])
+               for name in missing},
+        )
+        fields["impact_metrics"] = (remaining, ProductionIncident.model_fields["impact_metrics"])
+    return create_model("ProductionIncident", __doc__=ProductionIncident.__doc__, **fields)
+
+
+@lru_cache(maxsize=None)
+def shrunk_chain(missing: Tuple[str, ...]):
+    from langchain_core.prompts import PromptTemplate
+    from day3_4_exercise import llm, main_prompt
+    from fast_parsers import FastPydanticOutputParser
+
+    parser = FastPydanticOutputParser(pydantic_object=shrunk_schema(missing))
+    prompt = PromptTemplate(
+        input_variables=["incident_text"],
+        template=main_prompt.template,
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+    return prompt | llm | parser
+
+
+def extract_with_prefill(incident_text: str, config: Optional[Dict[str, Any]] = None):
+    """Regex-fill the impact metrics, let the LLM generate everything else"""
+    from day3_4_exercise import ProductionIncident
+
+    prefilled = as_impact_values(extract_metrics(incident_text))
+    missing = tuple(field for field in IMPACT_FIELDS if field not in prefilled)
+    partial = shrunk_chain(missing).invoke({"incident_text": incident_text}, config=config).model_dump()
+    impact = {field: None for field in IMPACT_FIELDS}
+    impact.update(partial.pop("impact_metrics", None) or {})
+    impact.update(prefilled)
+    return ProductionIncident(**partial, impact_metrics=impact)
+
+
+# ============================================================================
+# Mode 2: hints the LLM checks
+# ============================================================================
+
+HINT_BLOCK = """
+
+Numbers already found by a pattern matcher (verify each against the report;
+correct it, or use null, if it is wrong):
+{hints}"""
+
+
+@lru_cache(maxsize=None)
+def hinted_chain():
+    from langchain_core.prompts import PromptTemplate
+    from day3_4_exercise import llm, main_prompt, parser
+
+    prompt = PromptTemplate(
+        input_variables=["incident_text", "hints"],
+        template=main_prompt.template.replace("{incident_text}", "{incident_text}" + HINT_BLOCK),
+        partial_variables=main_prompt.partial_variables,
+    )
+    return prompt | llm | parser
+
+
+def extract_with_hints(incident_text: str, config: Optional[Dict[str, Any]] = None):
+    found = extract_metrics(incident_text)
+    hints = "\n".join(f"- {field}: {as_impact_values({field: found[field]})[field]} (from \"{snippet}\")"
+                      for field, (_, snippet) in found.items()) or "- none"
+    return hinted_chain().invoke({"incident_text": incident_text, "hints": hints}, config=config)
+
+
+# ============================================================================
+# Comparison against LLM-only extraction
+# ============================================================================
+
+def disagreements(regex_values: Dict[str, Any], llm_metrics: Dict[str, Any], tolerance: float = 0.01):
+    """Fields the regex found where the LLM produced a different value"""
+    differing = {}
+    for field, value in regex_values.items():
+        other = llm_metrics.get(field)
+        if other is None or abs(float(other) - float(value)) > tolerance * max(abs(float(value)), 1.0):
+            differing[field] = (value, other)
+    return differing
+
+
+if __name__ == "__main__":
+    from day3_4_exercise import chain as llm_chain, examples, test_incidents
+    from token_accounting import TokenAccountant
+
+    reports = test_incidents + [example["raw_text"] for example in examples]
+
+    print("=== REGEX PRE-EXTRACTION ===\n")
+    runs = 10_000
+    start = time.perf_counter()
+    for _ in range(runs):
+        for report in reports:
+            extract_metrics(report)
+    regex_us = (time.perf_counter() - start) / (runs * len(reports)) * 1e6
+    for report in reports:
+        print(f"{report.strip().splitlines()[0][:70]}")
+        for field, (value, snippet) in extract_metrics(report).items():
+            print(f"   {field:<22} {value:>12,.0f}   \"{snippet}\"")
+    print(f"\nRegex extraction: {regex_us:.1f}us per report\n")
+
+    print("=== PHRASING CASES ===\n")
+    for text, field, expected in PHRASING_CASES:
+        value = extract_metrics(text).get(field, (None, ""))[0]
+        print(f"{'✅' if value == expected else '❌'} {text:<45} {field} = {value} (expected {expected})")
+    print()
+
+    print("=== LLM-ONLY vs PREFILL vs HINTS ===\n")
+    accountant = TokenAccountant()
+    totals = {"llm": 0.0, "prefill": 0.0, "hints": 0.0}
+    output_tokens = {"llm": 0, "prefill": 0, "hints": 0}
+    compared, differing = 0, 0
+    for report in reports:
+        regex_values = as_impact_values(extract_metrics(report))
+        results = {}
+        for mode, run in (("llm", lambda text, config: llm_chain.invoke({"incident_text": text}, config=config)),
+                          ("prefill", extract_with_prefill),
+                          ("hints", extract_with_hints)):
+            before = len(accountant.records)
+            start = time.perf_counter()
+            try:
+                results[mode] = run(report, {"callbacks": [accountant], "metadata": {"chain": mode}})
+            except Exception as e:
+                print(f"   ❌ {mode}: {str(e)[:100]}")
+            totals[mode] += time.perf_counter() - start
+            output_tokens[mode] += sum(r.eval_count or 0 for r in accountant.records[before:])
+
+        if "llm" in results:
+            diff = disagreements(regex_values, results["llm"].impact_metrics.model_dump())
+            compared += len(regex_values)
+            differing += len(diff)
+            for field, (regex_value, llm_value) in diff.items():
+                print(f"   ≠ {field}: regex {regex_value} vs LLM {llm_value}")
+
+    print(f"\n{'Mode':<10} {'Total time':>12} {'Output tokens':>15}")
+    for mode in totals:
+        print(f"{mode:<10} {totals[mode]:>11.1f}s {output_tokens[mode]:>15,}")
+    print(f"\nLatency saved by prefill: {totals['llm'] - totals['prefill']:.1f}s over {len(reports)} reports")
+    if compared:
+        print(f"Regex vs LLM disagreement: {differing}/{compared} fields ({differing / compared:.0%})")
+    print("\n" + "="*100 + "\n")
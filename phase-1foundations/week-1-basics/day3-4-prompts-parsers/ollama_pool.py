@@ -0,0 +1,253 @@
+"""
+Day 3-4: Multi-Endpoint Ollama Pool
+Learning: Route each call to the least-loaded Ollama instance and hedge slow
+calls - after the running p95, send a duplicate elsewhere, keep whichever
+answers first and cancel the other
+"""
+
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseLLM
+from langchain_core.outputs import Generation, GenerationChunk, LLMResult
+from langchain_ollama import OllamaLLM
+from pydantic import Field, PrivateAttr
+
+
+class CancelledGeneration(Exception):
+    """Raised inside a hedge attempt that lost the race"""
+
+
+class _Backend:
+    """One Ollama endpoint plus its live load and latency figures"""
+
+    def __init__(self, url: str, llm: OllamaLLM):
+        self.url = url
+        self.llm = llm
+        self.outstanding = 0
+        self.ewma_latency: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+
+    def score(self, default_latency: float) -> float:
+        """Expected wait: queued requests times typical latency"""
+        latency = self.ewma_latency if self.ewma_latency is not None else default_latency
+        return (self.outstanding + 1) * latency
+
+
+class OllamaPool(BaseLLM):
+    """Drop-in replacement for OllamaLLM that spreads calls over endpoints.
+
+    ``pool = OllamaPool(endpoints=["http://gpu1:11434", "http://gpu2:11434"],
+    model="command-r", temperature=0.3, hedge=True)``
+    """
+    endpoints: List[str]
+    model: str = "command-r"
+    temperature: Optional[float] = None
+    llm_kwargs: Dict[str, Any] = Field(default_factory=dict)
+    """Extra OllamaLLM arguments (num_ctx, num_predict, ...)"""
+    hedge: bool = False
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+    """Latency samples needed before hedging starts"""
+    latency_window: int = 500
+    ewma_alpha: float = 0.2
+    max_workers: int = 64
+
+    _backends: List[_Backend] = PrivateAttr(default_factory=list)
+    _latencies: deque = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _executor: ThreadPoolExecutor = PrivateAttr()
+    _hedges_sent: int = PrivateAttr(default=0)
+    _hedges_won: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        if not self.endpoints:
+            raise ValueError("OllamaPool needs at least one endpoint")
+        self._backends = [
+            _Backend(url, OllamaLLM(model=self.model, temperature=self.temperature,
+                                    base_url=url, **self.llm_kwargs))
+            for url in self.endpoints
+        ]
+        self._latencies = deque(maxlen=self.latency_window)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="ollama-pool")
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-pool"
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def hedge_delay(self) -> Optional[float]:
+        """Running latency percentile, or None until there is enough data"""
+        with self._lock:
+            if len(self._latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * self.hedge_percentile), len(ordered) - 1)]
+
+    def _pick(self, exclude: Optional[_Backend] = None) -> _Backend:
+        """Least expected wait; random tie-break; reserves a slot"""
+        with self._lock:
+            known = [b.ewma_latency for b in self._backends if b.ewma_latency is not None]
+            default_latency = statistics.mean(known) if known else 1.0
+            candidates = [b for b in self._backends if b is not exclude] or self._backends
+            best = min(candidates, key=lambda b: (b.score(default_latency), random.random()))
+            best.outstanding += 1
+            best.requests += 1
+        return best
+
+    def _attempt(self, backend: _Backend, prompt: str, stop, cancel: threading.Event,
+                 **kwargs: Any) -> GenerationChunk:
+        """Stream one generation from ``backend``; stop early when cancelled"""
+        start = time.perf_counter()
+        final = None
+        stream = backend.llm._stream(prompt, stop=stop, **kwargs)
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    raise CancelledGeneration(backend.url)
+                final = chunk if final is None else final + chunk
+        except CancelledGeneration:
+            raise
+        except Exception:
+            with self._lock:
+                backend.errors += 1
+            raise
+        finally:
+            # Closing the stream closes the HTTP response, which makes Ollama
+            # abort the generation on a cancelled attempt
+            stream.close()
+            with self._lock:
+                backend.outstanding -= 1
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._latencies.append(elapsed)
+            backend.ewma_latency = elapsed if backend.ewma_latency is None else (
+                self.ewma_alpha * elapsed + (1 - self.ewma_alpha) * backend.ewma_latency)
+        return final or GenerationChunk(text="")
+
+    def _generate_one(self, prompt: str, stop, **kwargs: Any) -> GenerationChunk:
+        primary_backend = self._pick()
+        primary_cancel = threading.Event()
+        primary = self._executor.submit(
+            self._attempt, primary_backend, prompt, stop, primary_cancel, **kwargs)
+
+        delay = self.hedge_delay() if self.hedge and len(self._backends) > 1 else None
+        if delay is None:
+            return primary.result()
+
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        # Primary is past the running p95: race a duplicate on another endpoint
+        with self._lock:
+            self._hedges_sent += 1
+        hedge_cancel = threading.Event()
+        hedge = self._executor.submit(
+            self._attempt, self._pick(exclude=primary_backend), prompt, stop, hedge_cancel, **kwargs)
+        attempts = {primary: primary_cancel, hedge: hedge_cancel}
+
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        attempts[other].set()
+                    if future is hedge:
+                        with self._lock:
+                            self._hedges_won += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        generations = []
+        for prompt in prompts:
+            final = self._generate_one(prompt, stop, **kwargs)
+            generations.append([Generation(text=final.text, generation_info=final.generation_info)])
+        return LLMResult(generations=generations)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hedges_sent": self._hedges_sent,
+                "hedges_won": self._hedges_won,
+                "backends": [
+                    {"url": b.url, "requests": b.requests, "errors": b.errors,
+                     "outstanding": b.outstanding, "ewma_latency": b.ewma_latency}
+                    for b in self._backends
+                ],
+            }
+
+
+# ============================================================================
+# Demo: p99 with stragglers, single endpoint vs pool vs hedged pool
+# ============================================================================
+
+def latency_profile(llm: BaseLLM, prompts: List[str], concurrency: int) -> Dict[str, float]:
+    """Per-call latency percentiles for ``prompts`` run ``concurrency`` at a time"""
+    def timed(prompt: str) -> float:
+        start = time.perf_counter()
+        llm.invoke(prompt)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed, prompts))
+    def percentile(q: float) -> float:
+        return latencies[min(int(len(latencies) * q), len(latencies) - 1)]
+
+    return {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99),
+            "max": latencies[-1]}
+
+
+if __name__ == "__main__":
+    from fake_ollama import FakeOllamaServer
+    from fewshot_prompting import few_shot_prompt, test_incidents
+
+    # 4 fake endpoints; 3% of requests on each become 20x stragglers
+    servers = [FakeOllamaServer(token_delay=0.004, straggler_rate=0.03, seed=i).start()
+               for i in range(4)]
+    urls = [s.url for s in servers]
+    prompts = [few_shot_prompt.format(incident=test_incidents[i % len(test_incidents)])
+               for i in range(400)]
+
+    setups = [
+        ("Single endpoint", OllamaLLM(model="command-r", base_url=urls[0])),
+        ("Pool (least-loaded)", OllamaPool(endpoints=urls)),
+        ("Pool + hedging", OllamaPool(endpoints=urls, hedge=True)),
+    ]
+
+    print("=== OLLAMA POOL: TAIL LATENCY WITH STRAGGLERS ===\n")
+    print(f"{'Setup':<22} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name, llm in setups:
+        profile = latency_profile(llm, prompts, concurrency=8)
+        print(f"{name:<22} " + " ".join(f"{profile[k]*1000:>6.0f}ms" for k in ["p50", "p95", "p99", "max"]))
+        if isinstance(llm, OllamaPool):
+            stats = llm.stats()
+            print(f"{'':<22} hedges sent {stats['hedges_sent']}, won {stats['hedges_won']}, "
+                  f"requests per endpoint {[b['requests'] for b in stats['backends']]}")
+
+    print(f"\nGenerations cancelled server-side: {sum(s.cancelled for s in servers)}")
+    for server in servers:
+        server.stop()
+    print("\n" + "="*100 + "\n")
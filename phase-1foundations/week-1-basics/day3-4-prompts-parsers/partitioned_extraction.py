@@ -0,0 +1,97 @@
+"""
+Day 3-4: Schema-Partitioned Parallel Extraction
+Learning: Split the ProductionIncident schema (not the report) into sub-models,
+generate each one concurrently, and retry only the sub-model that failed
+"""
+
+import time
+from typing import Dict, List, Tuple
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.runnables import RunnableParallel
+from pydantic import ValidationError
+
+from day3_4_exercise import llm, safe_extract, test_incidents, ProductionIncident
+from sectioned_extraction import PART_MODELS, build_part_prompt, reduce_parts
+
+# ============================================================================
+# One prompt | llm per sub-model, parsed outside the chain
+# ============================================================================
+
+# Parsing happens outside the LCEL chain so a validation error in one
+# sub-model leaves the raw outputs of the others untouched
+part_prompts = {}
+part_parsers = {}
+for part in PART_MODELS:
+    part_prompts[part], part_parsers[part] = build_part_prompt(part)
+
+raw_chains = {part: part_prompts[part] | llm for part in PART_MODELS}
+
+
+def extract_partitioned(
+    incident_text: str,
+    max_attempts: int = 2,
+    max_concurrency: int = 4,
+) -> Tuple[ProductionIncident, Dict[str, int]]:
+    """Extract every sub-model concurrently, re-generating only failed ones.
+
+    Returns the assembled incident and the number of attempts per sub-model.
+    Raises OutputParserException once a sub-model runs out of attempts.
+    """
+    attempts = {part: 0 for part in PART_MODELS}
+    parsed = {}
+    pending = list(PART_MODELS)
+
+    while pending:
+        raw_outputs = RunnableParallel({part: raw_chains[part] for part in pending}).invoke(
+            {"section_text": incident_text},
+            config={"max_concurrency": max_concurrency},
+        )
+
+        failed: List[str] = []
+        for part in pending:
+            attempts[part] += 1
+            try:
+                parsed[part] = part_parsers[part].parse(raw_outputs[part])
+            except OutputParserException as e:
+                print(f"   ⚠️  {part} attempt {attempts[part]} failed: {str(e)[:100]}")
+                if attempts[part] >= max_attempts:
+                    raise OutputParserException(
+                        f"Sub-model '{part}' failed after {attempts[part]} attempts: {e}"
+                    ) from e
+                failed.append(part)
+        pending = failed
+
+    # Assemble and validate the parts together as one ProductionIncident
+    try:
+        incident = reduce_parts(parsed)
+    except ValidationError as e:
+        raise OutputParserException(f"Assembled incident failed validation: {e}") from e
+    return incident, attempts
+
+
+if __name__ == "__main__":
+    print("="*100)
+    print("SCHEMA-PARTITIONED PARALLEL EXTRACTION")
+    print("="*100 + "\n")
+
+    for i, incident_text in enumerate(test_incidents, 1):
+        print(f"TEST CASE {i}: {incident_text.strip().splitlines()[0]}\n")
+
+        start = time.perf_counter()
+        single, success = safe_extract(incident_text)
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            partitioned, attempts = extract_partitioned(incident_text)
+        except OutputParserException as e:
+            print(f"❌ Partitioned extraction failed: {e}\n")
+            continue
+        partitioned_seconds = time.perf_counter() - start
+
+        print(f"   Single pass:  {single_seconds:6.1f}s ({'ok' if success else 'failed'})")
+        print(f"   Partitioned:  {partitioned_seconds:6.1f}s")
+        print(f"   Attempts per sub-model: {attempts}")
+        print(f"   {partitioned.incident_id} | {partitioned.severity} | {partitioned.title}\n")
+        print("="*100 + "\n")
@@ -0,0 +1,276 @@
+"""
+Day 3-4: Section-wise Map-Reduce Extraction
+Learning: Split long incident reports by section header, extract each section
+in parallel with small focused prompts, then merge deterministically
+"""
+
+import re
+import time
+from typing import Dict, List
+
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableParallel
+from pydantic import BaseModel, Field
+
+from fast_parsers import FastPydanticOutputParser
+from day3_4_exercise import (
+    llm,
+    chain as single_pass_chain,
+    test_incidents,
+    ImpactMetrics,
+    RootCauseAnalysis,
+    ResolutionPlan,
+    ProductionIncident,
+)
+
+# Reports shorter than this go through the original single-pass chain:
+# splitting only pays off once one long generation dominates the latency
+SECTIONED_MIN_CHARS = 1500
+
+# ============================================================================
+# Section Splitter
+# ============================================================================
+
+# Known section headers and the ProductionIncident part each one feeds.
+# Headers not listed here (e.g. "Severity:", "System:") stay inside the
+# section they appear in.
+SECTION_TARGETS = {
+    "IMPACT": "impact_metrics",
+    "SLA": "impact_metrics",
+    "SLA BREACH": "impact_metrics",
+    "ROOT CAUSE": "root_cause",
+    "ROOT CAUSE INVESTIGATION": "root_cause",
+    "CAUSE": "root_cause",
+    "TECHNICAL DETAILS": "root_cause",
+    "AFFECTED SYSTEMS": "root_cause",
+    "COMPONENTS AFFECTED": "root_cause",
+    "RESOLUTION": "resolution",
+    "IMMEDIATE RESPONSE": "resolution",
+    "ACTIONS TAKEN": "resolution",
+    "ACTIONS": "resolution",
+    "FIX": "resolution",
+    "PERMANENT FIXES": "resolution",
+    "PREVENTION": "resolution",
+    "ESTIMATED EFFORT": "resolution",
+    "EFFORT": "resolution",
+    "TIMELINE": "resolution",
+}
+
+HEADER_PATTERN = re.compile(r"^\s*([A-Za-z][A-Za-z /]{1,40}?)\s*:")
+
+
+def split_sections(report_text: str) -> List[Dict[str, str]]:
+    """Split a report into sections at known headers.
+
+    Everything before the first known header is the "HEADER" section
+    (incident id, title, severity and the opening summary).
+    """
+    sections = [{"name": "HEADER", "target": "header", "text": ""}]
+    for line in report_text.strip().splitlines():
+        match = HEADER_PATTERN.match(line)
+        name = match.group(1).strip().upper() if match else None
+        if name in SECTION_TARGETS:
+            sections.append({"name": name, "target": SECTION_TARGETS[name], "text": ""})
+        sections[-1]["text"] += line.strip() + "\n"
+    return [section for section in sections if section["text"].strip()]
+
+
+def group_sections(report_text: str, sections: List[Dict[str, str]]) -> Dict[str, str]:
+    """Build the input text for each extraction part.
+
+    The header part also sees the impact sections (severity and priority
+    depend on them), and the impact part also sees the header prose -
+    opening summaries often state the numbers ("approximately 6,000 users",
+    "420 calls") before any IMPACT/SLA header. A part with no matching
+    section falls back to the full report so no field loses its source text.
+    """
+    grouped = {part: "" for part in PART_MODELS}
+    for section in sections:
+        grouped[section["target"]] += section["text"] + "\n"
+    header, impact = grouped["header"], grouped["impact_metrics"]
+    grouped["header"] = header + impact
+    if impact.strip():
+        grouped["impact_metrics"] = header + impact
+    return {
+        part: text.strip() if text.strip() else report_text.strip()
+        for part, text in grouped.items()
+    }
+
+
+# ============================================================================
+# Focused Per-Part Chains (Map)
+# ============================================================================
+
+class IncidentHeader(BaseModel):
+    """Top-level incident fields, without the nested sub-models"""
+    incident_id: str = Field(description="Unique incident identifier")
+    title: str = Field(description="Brief incident title")
+    severity: str = Field(description="CRITICAL, HIGH, MEDIUM, LOW")
+    category: str = Field(description="Incident category")
+    description: str = Field(description="Detailed description")
+    priority_score: int = Field(description="Priority score from 1-10")
+
+
+PART_MODELS = {
+    "header": IncidentHeader,
+    "impact_metrics": ImpactMetrics,
+    "root_cause": RootCauseAnalysis,
+    "resolution": ResolutionPlan,
+}
+
+PART_FOCUS = {
+    "header": "the incident identifier, title, severity, category, a short description and a priority score",
+    "impact_metrics": "the business and technical impact metrics (use null for any metric that is not stated)",
+    "root_cause": "the primary root cause, contributing factors and affected system components",
+    "resolution": "the immediate actions, preventive measures and estimated hours to full resolution",
+}
+
+part_template = """You are an expert incident analyst for banking production systems.
+
+From the incident report text below, extract {focus}:
+
+{section_text}
+
+{format_instructions}
+
+Return ONLY valid JSON matching the schema."""
+
+
+def build_part_prompt(part: str):
+    """Prompt and parser for a single ProductionIncident part"""
+    part_parser = FastPydanticOutputParser(pydantic_object=PART_MODELS[part])
+    part_prompt = PromptTemplate(
+        input_variables=["section_text"],
+        template=part_template,
+        partial_variables={
+            "focus": PART_FOCUS[part],
+            "format_instructions": part_parser.get_format_instructions(),
+        },
+    )
+    return part_prompt, part_parser
+
+
+def build_part_chain(part: str):
+    """prompt | llm | parser for a single ProductionIncident part"""
+    part_prompt, part_parser = build_part_prompt(part)
+    return part_prompt | llm | part_parser
+
+
+part_chains = {part: build_part_chain(part) for part in PART_MODELS}
+
+# Each branch picks its own text out of the grouped input and retries on its
+# own, so one bad part never forces the others to be regenerated
+map_chain = RunnableParallel({
+    part: (lambda grouped, part=part: {"section_text": grouped[part]})
+    | part_chain.with_retry(stop_after_attempt=2)
+    for part, part_chain in part_chains.items()
+})
+
+# ============================================================================
+# Deterministic Reducer
+# ============================================================================
+
+def _dedupe(items: List[str]) -> List[str]:
+    """Drop repeated list entries (case/whitespace-insensitive), keep order"""
+    seen = set()
+    unique = []
+    for item in items:
+        key = " ".join(item.lower().split()).rstrip(".")
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(item.strip())
+    return unique
+
+
+def reduce_parts(parts: Dict[str, BaseModel]) -> ProductionIncident:
+    """Merge the per-part results into one ProductionIncident"""
+    header = parts["header"]
+    root_cause = parts["root_cause"]
+    resolution = parts["resolution"]
+    return ProductionIncident(
+        incident_id=header.incident_id.strip(),
+        title=header.title.strip(),
+        severity=header.severity.strip().upper(),
+        category=header.category.strip(),
+        description=header.description.strip(),
+        priority_score=min(max(header.priority_score, 1), 10),
+        impact_metrics=parts["impact_metrics"],
+        root_cause=RootCauseAnalysis(
+            primary_cause=root_cause.primary_cause.strip(),
+            contributing_factors=_dedupe(root_cause.contributing_factors),
+            affected_components=_dedupe(root_cause.affected_components),
+        ),
+        resolution=ResolutionPlan(
+            immediate_actions=_dedupe(resolution.immediate_actions),
+            preventive_measures=_dedupe(resolution.preventive_measures),
+            estimated_resolution_hours=resolution.estimated_resolution_hours,
+        ),
+    )
+
+
+def extract_sectioned(report_text: str, max_concurrency: int = 4) -> ProductionIncident:
+    """Map-reduce extraction: split -> parallel per-part chains -> reduce"""
+    grouped = group_sections(report_text, split_sections(report_text))
+    parts = map_chain.invoke(grouped, config={"max_concurrency": max_concurrency})
+    return reduce_parts(parts)
+
+
+def extract_incident(report_text: str, min_chars: int = SECTIONED_MIN_CHARS) -> ProductionIncident:
+    """Use map-reduce for long, sectioned reports and one pass otherwise"""
+    known_sections = [s for s in split_sections(report_text) if s["target"] != "header"]
+    if len(report_text) < min_chars or len(known_sections) < 2:
+        return single_pass_chain.invoke({"incident_text": report_text})
+    return extract_sectioned(report_text)
+
+
+def field_completeness(incident: ProductionIncident) -> float:
+    """Fraction of leaf fields that are filled (not null / empty)"""
+    def leaves(value):
+        if isinstance(value, dict):
+            for child in value.values():
+                yield from leaves(child)
+        else:
+            yield value
+
+    values = list(leaves(incident.model_dump()))
+    filled = [v for v in values if v not in (None, "", [])]
+    return len(filled) / len(values)
+
+
+def filled_impact_fields(incident: ProductionIncident) -> List[str]:
+    """ImpactMetrics fields that were extracted (not null)"""
+    return [field for field, value in incident.impact_metrics.model_dump().items() if value is not None]
+
+
+if __name__ == "__main__":
+    report = test_incidents[1]  # INC-2024-2156, the longest sectioned report
+
+    print("=== SECTION SPLIT ===\n")
+    for section in split_sections(report):
+        print(f"  {section['name']:<24} -> {section['target']:<15} ({len(section['text'])} chars)")
+    print()
+
+    print("=== SINGLE PASS vs SECTION-WISE MAP-REDUCE ===\n")
+    start = time.perf_counter()
+    single = single_pass_chain.invoke({"incident_text": report})
+    single_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sectioned = extract_sectioned(report)
+    sectioned_seconds = time.perf_counter() - start
+
+    print(f"Single pass:   {single_seconds:6.1f}s  completeness {field_completeness(single):.0%}")
+    print(f"Map-reduce:    {sectioned_seconds:6.1f}s  completeness {field_completeness(sectioned):.0%}")
+    print(f"Speedup:       {single_seconds / sectioned_seconds:.2f}x\n")
+
+    print(f"Merged incident:\n{sectioned.model_dump_json(indent=2)}\n")
+    print("="*100 + "\n")
+
+    print("=== IMPACT FIELDS: SINGLE PASS vs MAP-REDUCE ===\n")
+    for report in test_incidents:
+        single_fields = filled_impact_fields(single_pass_chain.invoke({"incident_text": report}))
+        sectioned_fields = filled_impact_fields(extract_sectioned(report))
+        ok = single_fields == sectioned_fields
+        print(f"{'✅' if ok else '❌'} {report.strip().splitlines()[0][:50]:<50} "
+              f"single {single_fields} | map-reduce {sectioned_fields}")
+    print("\n" + "="*100 + "\n")
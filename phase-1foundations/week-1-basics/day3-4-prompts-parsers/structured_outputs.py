@@ -1,22 +1,37 @@
 """
 Day 3-4: Structured Outputs with Pydantic
 Learning: Type-safe parsing, validation, and error handling
+
+Schemas are defined at import time; the LLM, parsers, prompts and chains
+are built on first use (see lazy_registry.py). Run one example with
+``python ../cli.py structured <technique>``.
 """
 
-from langchain_ollama import OllamaLLM
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import JsonOutputParser, PydanticOutputParser
 from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional
 import json
+import time
+
+from lazy_registry import LazyRegistry
+
+lazy = LazyRegistry(__name__)
+__getattr__ = lazy.module_getattr
+
+
+@lazy
+def _llm():
+    from langchain_ollama import OllamaLLM
+    return OllamaLLM(model="command-r", temperature=0.3)  # Lower temp for structured output
 
-llm = OllamaLLM(model="command-r", temperature=0.3)  # Lower temp for structured output
+
+def _fast_parser(schema):
+    # Fast-path parser repairs fences/trailing commas/prose instead of spending a retry
+    from fast_parsers import FastPydanticOutputParser
+    return FastPydanticOutputParser(pydantic_object=schema)
 
 # ============================================================================
 # EXAMPLE 1: Basic Pydantic Model
 # ============================================================================
-print("=== EXAMPLE 1: BASIC PYDANTIC MODEL ===\n")
-
 class IncidentReport(BaseModel):
     """Schema for incident report extraction"""
     incident_id: str = Field(description="Unique identifier for the incident")
@@ -25,21 +40,28 @@ class IncidentReport(BaseModel):
     affected_systems: List[str] = Field(description="List of affected systems")
     estimated_impact: str = Field(description="Business impact assessment")
     
-parser = PydanticOutputParser(pydantic_object=IncidentReport)
+@lazy
+def _parser():
+    return _fast_parser(IncidentReport)
 
-prompt = PromptTemplate(
-    input_variables=["incident_text"],
-    template="""Extract structured information from this incident report:
+@lazy
+def _prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["incident_text"],
+        template="""Extract structured information from this incident report:
 
 {incident_text}
 
 {format_instructions}
 
 Return only valid JSON matching the schema.""",
-    partial_variables={"format_instructions": parser.get_format_instructions()}
-)
+        partial_variables={"format_instructions": lazy.parser.get_format_instructions()}
+    )
 
-chain = prompt | llm | parser
+@lazy
+def _chain():
+    return lazy.prompt | lazy.llm | lazy.parser
 
 incident_text = """
 INC-2024-10234: Production payment gateway experienced intermittent 
@@ -49,24 +71,9 @@ performance. Estimated revenue impact: $75,000 in failed transactions.
 Customer support received 200+ complaints.
 """
 
-try:
-    result = chain.invoke({"incident_text": incident_text})
-    print(f"Parsed Incident Report:")
-    print(f"  ID: {result.incident_id}")
-    print(f"  Severity: {result.severity}")
-    print(f"  Description: {result.description}")
-    print(f"  Affected Systems: {', '.join(result.affected_systems)}")
-    print(f"  Impact: {result.estimated_impact}\n")
-except Exception as e:
-    print(f"Parsing error: {e}\n")
-
-print("="*100 + "\n")
-
 # ============================================================================
 # EXAMPLE 2: Nested Pydantic Models
 # ============================================================================
-print("=== EXAMPLE 2: NESTED MODELS ===\n")
-
 class SLAMetrics(BaseModel):
     """SLA performance metrics"""
     target_response_time_ms: int = Field(description="Target response time in milliseconds")
@@ -82,21 +89,28 @@ class SystemHealth(BaseModel):
     error_count_24h: int = Field(description="Number of errors in last 24 hours")
     recommendation: str = Field(description="Recommended action based on metrics")
 
-parser2 = PydanticOutputParser(pydantic_object=SystemHealth)
+@lazy
+def _parser2():
+    return _fast_parser(SystemHealth)
 
-prompt2 = PromptTemplate(
-    input_variables=["system_data"],
-    template="""Analyze this system monitoring data and extract structured information:
+@lazy
+def _prompt2():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["system_data"],
+        template="""Analyze this system monitoring data and extract structured information:
 
 {system_data}
 
 {format_instructions}
 
 Provide complete JSON matching the schema.""",
-    partial_variables={"format_instructions": parser2.get_format_instructions()}
-)
+        partial_variables={"format_instructions": lazy.parser2.get_format_instructions()}
+    )
 
-chain2 = prompt2 | llm | parser2
+@lazy
+def _chain2():
+    return lazy.prompt2 | lazy.llm | lazy.parser2
 
 system_data = """
 Payment Processing Service showed 99.2% uptime over the last week. 
@@ -106,29 +120,15 @@ System logged 234 errors in the past 24 hours, mostly timeout exceptions.
 Immediate scaling of compute resources recommended.
 """
 
-try:
-    result2 = chain2.invoke({"system_data": system_data})
-    print(f"System Health Report:")
-    print(f"  System: {result2.system_name}")
-    print(f"  Availability: {result2.availability_percentage}%")
-    print(f"  SLA Status: {result2.sla_metrics.breach_status}")
-    print(f"  Target Response: {result2.sla_metrics.target_response_time_ms}ms")
-    print(f"  Actual Response: {result2.sla_metrics.actual_response_time_ms}ms")
-    print(f"  24h Errors: {result2.error_count_24h}")
-    print(f"  Recommendation: {result2.recommendation}\n")
-except Exception as e:
-    print(f"Parsing error: {e}\n")
-
-print("="*100 + "\n")
-
 # ============================================================================
 # EXAMPLE 3: JsonOutputParser (More Flexible)
 # ============================================================================
-print("=== EXAMPLE 3: JSON OUTPUT PARSER ===\n")
-
-json_prompt = PromptTemplate(
-    input_variables=["transaction_data"],
-    template="""Analyze this payment transaction data and return JSON with these fields:
+@lazy
+def _json_prompt():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["transaction_data"],
+        template="""Analyze this payment transaction data and return JSON with these fields:
 - transaction_id (string)
 - amount_usd (number)
 - status (string: success, failed, pending)
@@ -139,10 +139,16 @@ json_prompt = PromptTemplate(
 Transaction Data: {transaction_data}
 
 Return ONLY valid JSON, no other text:"""
-)
+    )
+
+@lazy
+def _json_parser():
+    from fast_parsers import FastJsonOutputParser
+    return FastJsonOutputParser()
 
-json_parser = JsonOutputParser()
-chain3 = json_prompt | llm | json_parser
+@lazy
+def _chain3():
+    return lazy.json_prompt | lazy.llm | lazy.json_parser
 
 transaction_data = """
 TXN-98765: Wire transfer of $125,000 from Account A to Account B 
@@ -151,21 +157,9 @@ Transaction initiated 3 times, all failed. Customer is VIP tier.
 Current account balance shows sufficient funds.
 """
 
-try:
-    result3 = chain3.invoke({"transaction_data": transaction_data})
-    print(f"Parsed Transaction Analysis:")
-    print(json.dumps(result3, indent=2))
-    print()
-except Exception as e:
-    print(f"JSON parsing error: {e}\n")
-
-print("="*100 + "\n")
-
 # ============================================================================
 # EXAMPLE 4: Error Handling & Fallback
 # ============================================================================
-print("=== EXAMPLE 4: ERROR HANDLING ===\n")
-
 class FailedClientInteraction(BaseModel):
     """Schema for failed client interaction analysis"""
     interaction_type: str = Field(description="Type: API_CALL, UI_ACTION, BATCH_JOB")
@@ -174,21 +168,28 @@ class FailedClientInteraction(BaseModel):
     root_cause: str = Field(description="Identified root cause")
     mitigation_steps: List[str] = Field(description="List of mitigation steps")
 
-parser4 = PydanticOutputParser(pydantic_object=FailedClientInteraction)
+@lazy
+def _parser4():
+    return _fast_parser(FailedClientInteraction)
 
-prompt4 = PromptTemplate(
-    input_variables=["fci_data"],
-    template="""Analyze this Failed Client Interaction data:
+@lazy
+def _prompt4():
+    from langchain_core.prompts import PromptTemplate
+    return PromptTemplate(
+        input_variables=["fci_data"],
+        template="""Analyze this Failed Client Interaction data:
 
 {fci_data}
 
 {format_instructions}
 
 Return valid JSON only.""",
-    partial_variables={"format_instructions": parser4.get_format_instructions()}
-)
+        partial_variables={"format_instructions": lazy.parser4.get_format_instructions()}
+    )
 
-chain4 = prompt4 | llm
+@lazy
+def _chain4():
+    return lazy.prompt4 | lazy.llm
 
 fci_data = """
 API endpoint /api/v2/payments/process returned 503 Service Unavailable 
@@ -197,31 +198,110 @@ backend pool exhaustion. High business impact affecting real-time payments.
 Immediate actions: scale backend, implement circuit breaker, add request queuing.
 """
 
-def safe_parse(chain, parser, input_data, max_retries=2):
-    """Parse with fallback and retries"""
+def safe_parse(chain, parser, input_data, max_retries=2, deadline=None):
+    """Parse with fallback and retries.
+
+    With a `deadlines.Deadline` the LLM call is cancelled when the budget
+    runs out, and a retry only starts if the time left covers another
+    attempt as long as the last one. Both cases raise DeadlineExceeded, so
+    callers can tell a blown budget from a parse failure.
+    """
+    from deadlines import DeadlineExceeded, invoke_with_deadline
+
+    raw_output = None
     for attempt in range(max_retries):
+        start = time.perf_counter()
         try:
-            raw_output = chain.invoke(input_data)
+            raw_output = invoke_with_deadline(chain, input_data, deadline)
             parsed = parser.parse(raw_output)
             print(f"✅ Successfully parsed on attempt {attempt + 1}")
             return parsed
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             print(f"❌ Attempt {attempt + 1} failed: {e}")
             if attempt == max_retries - 1:
                 print("⚠️  All parsing attempts failed. Returning raw output.")
                 return raw_output
+            if deadline is not None and not deadline.allows(time.perf_counter() - start):
+                raise DeadlineExceeded(
+                    f"{deadline.remaining():.1f}s left, not enough for another attempt") from e
     return None
 
-result4 = safe_parse(chain4, parser4, {"fci_data": fci_data})
-
-if isinstance(result4, FailedClientInteraction):
-    print(f"\nParsed FCI Analysis:")
-    print(f"  Type: {result4.interaction_type}")
-    print(f"  Failures: {result4.failure_count}")
-    print(f"  Impact Score: {result4.impact_score}/10")
-    print(f"  Root Cause: {result4.root_cause}")
-    print(f"  Mitigations: {', '.join(result4.mitigation_steps)}")
-else:
-    print(f"\nRaw output (parsing failed):\n{result4}")
-
-print("\n" + "="*100 + "\n")
+def parse_fci(inputs):
+    """Example 4 as one call: chain4 output parsed by safe_parse"""
+    return safe_parse(lazy.chain4, lazy.parser4, inputs)
+
+# Techniques runnable through ../cli.py
+TECHNIQUES = {
+    "basic": {"title": "EXAMPLE 1: BASIC PYDANTIC MODEL", "chain": "chain",
+              "inputs": [{"incident_text": incident_text}]},
+    "nested": {"title": "EXAMPLE 2: NESTED MODELS", "chain": "chain2",
+               "inputs": [{"system_data": system_data}]},
+    "json": {"title": "EXAMPLE 3: JSON OUTPUT PARSER", "chain": "chain3",
+             "inputs": [{"transaction_data": transaction_data}]},
+    "error-handling": {"title": "EXAMPLE 4: ERROR HANDLING", "function": parse_fci,
+                       "inputs": [{"fci_data": fci_data}]},
+}
+
+
+if __name__ == "__main__":
+    print("=== EXAMPLE 1: BASIC PYDANTIC MODEL ===\n")
+
+    try:
+        result = lazy.chain.invoke({"incident_text": incident_text})
+        print(f"Parsed Incident Report:")
+        print(f"  ID: {result.incident_id}")
+        print(f"  Severity: {result.severity}")
+        print(f"  Description: {result.description}")
+        print(f"  Affected Systems: {', '.join(result.affected_systems)}")
+        print(f"  Impact: {result.estimated_impact}\n")
+    except Exception as e:
+        print(f"Parsing error: {e}\n")
+
+    print("="*100 + "\n")
+
+    print("=== EXAMPLE 2: NESTED MODELS ===\n")
+
+    try:
+        result2 = lazy.chain2.invoke({"system_data": system_data})
+        print(f"System Health Report:")
+        print(f"  System: {result2.system_name}")
+        print(f"  Availability: {result2.availability_percentage}%")
+        print(f"  SLA Status: {result2.sla_metrics.breach_status}")
+        print(f"  Target Response: {result2.sla_metrics.target_response_time_ms}ms")
+        print(f"  Actual Response: {result2.sla_metrics.actual_response_time_ms}ms")
+        print(f"  24h Errors: {result2.error_count_24h}")
+        print(f"  Recommendation: {result2.recommendation}\n")
+    except Exception as e:
+        print(f"Parsing error: {e}\n")
+
+    print("="*100 + "\n")
+
+    print("=== EXAMPLE 3: JSON OUTPUT PARSER ===\n")
+
+    try:
+        result3 = lazy.chain3.invoke({"transaction_data": transaction_data})
+        print(f"Parsed Transaction Analysis:")
+        print(json.dumps(result3, indent=2))
+        print()
+    except Exception as e:
+        print(f"JSON parsing error: {e}\n")
+
+    print("="*100 + "\n")
+
+    print("=== EXAMPLE 4: ERROR HANDLING ===\n")
+
+    result4 = parse_fci({"fci_data": fci_data})
+
+    if isinstance(result4, FailedClientInteraction):
+        print(f"\nParsed FCI Analysis:")
+        print(f"  Type: {result4.interaction_type}")
+        print(f"  Failures: {result4.failure_count}")
+        print(f"  Impact Score: {result4.impact_score}/10")
+        print(f"  Root Cause: {result4.root_cause}")
+        print(f"  Mitigations: {', '.join(result4.mitigation_steps)}")
+    else:
+        print(f"\nRaw output (parsing failed):\n{result4}")
+
+    print("\n" + "="*100 + "\n")
@@ -0,0 +1,265 @@
+"""
+Day 3-4: Token Accounting & Latency Estimation
+Learning: Count prompt tokens before a call, record Ollama's real token
+counts after it, and use that history to predict how long a batch will take
+"""
+
+import json
+import time
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from pydantic import BaseModel
+
+try:
+    import tiktoken  # optional: pip install tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _encoding = None
+
+# Ollama's context window when num_ctx is not set on OllamaLLM
+DEFAULT_NUM_CTX = 2048
+# Starting heuristic until real prompt_eval_count values calibrate it
+DEFAULT_CHARS_PER_TOKEN = 4.0
+
+
+class CallRecord(BaseModel):
+    """Token counts and timings of one finished LLM call"""
+    chain: str
+    prompt_chars: int
+    estimated_prompt_tokens: int
+    prompt_eval_count: Optional[int] = None
+    eval_count: Optional[int] = None
+    prompt_eval_seconds: Optional[float] = None
+    eval_seconds: Optional[float] = None
+    wall_seconds: float
+
+
+class BatchEstimate(BaseModel):
+    """Pre-flight estimate for a queued batch"""
+    prompts: int
+    prompt_tokens: int
+    expected_output_tokens: int
+    estimated_seconds: float
+    over_context: List[int]
+    """Indexes of prompts that would not fit in num_ctx"""
+
+
+class TokenAccountant(BaseCallbackHandler):
+    """Callback handler that counts tokens and keeps a per-chain history.
+
+    Tag calls with the chain they belong to through config metadata, e.g.
+    ``chain.invoke(inputs, config={"callbacks": [accountant],
+    "metadata": {"chain": "production_incident"}})``.
+
+    OllamaLLM does not report ``num_ctx``/``num_predict`` in the callback's
+    invocation params, so pass the model's values here (or per call as
+    ``num_ctx``/``num_predict`` metadata) for the pre-send context check.
+    """
+
+    def __init__(self, history_path: Optional[str] = None, num_ctx: Optional[int] = None,
+                 num_predict: Optional[int] = None):
+        self.history_path = history_path
+        self.num_ctx = num_ctx
+        self.num_predict = num_predict
+        self.records: List[CallRecord] = []
+        self._pending: Dict[UUID, Dict[str, Any]] = {}
+        self.context_warnings: List[str] = []
+        if history_path:
+            try:
+                with open(history_path) as f:
+                    self.records = [CallRecord(**r) for r in json.load(f)]
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Counting
+    # ------------------------------------------------------------------
+
+    @property
+    def chars_per_token(self) -> float:
+        """Heuristic ratio, calibrated from the prompts Ollama has counted"""
+        counted = [r for r in self.records if r.prompt_eval_count]
+        if not counted:
+            return DEFAULT_CHARS_PER_TOKEN
+        return sum(r.prompt_chars for r in counted) / sum(r.prompt_eval_count for r in counted)
+
+    def count_tokens(self, text: str) -> int:
+        """Local tokenizer when installed, calibrated heuristic otherwise"""
+        if _encoding is not None:
+            return len(_encoding.encode(text))
+        return max(1, round(len(text) / self.chars_per_token))
+
+    def fits_context(self, prompt: str, num_ctx: Optional[int] = None, num_predict: int = 0) -> bool:
+        """True when prompt + expected output fit into the context window"""
+        return self.count_tokens(prompt) + num_predict <= (num_ctx or DEFAULT_NUM_CTX)
+
+    # ------------------------------------------------------------------
+    # Callbacks
+    # ------------------------------------------------------------------
+
+    def on_llm_start(
+        self,
+        serialized: Dict[str, Any],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        chain = metadata.get("chain", "default")
+        num_ctx = self._setting("num_ctx", metadata, serialized)
+        num_predict = self._setting("num_predict", metadata, serialized)
+        # Ollama treats num_predict=-1 as "until the model stops"
+        reserved = num_predict if num_predict and num_predict > 0 else 0
+        if not self.fits_context(prompts[0], num_ctx, reserved):
+            # Ollama would silently truncate the prompt from the front
+            self.context_warnings.append(chain)
+            print(f"   ⚠️  [{chain}] prompt (~{self.count_tokens(prompts[0])} tokens) "
+                  f"+ num_predict={reserved} exceeds num_ctx={num_ctx or DEFAULT_NUM_CTX}")
+        self._pending[run_id] = {
+            "chain": chain,
+            "prompt": prompts[0],
+            "start": time.perf_counter(),
+        }
+
+    def _setting(self, name: str, metadata: Dict[str, Any], serialized: Dict[str, Any]) -> Optional[int]:
+        """Per-call metadata, then the serialized LLM, then the constructor value"""
+        if metadata.get(name) is not None:
+            return metadata[name]
+        value = ((serialized or {}).get("kwargs") or {}).get(name)
+        return value if value is not None else getattr(self, name)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        info = response.generations[0][0].generation_info or {}
+        prompt_eval_ns = info.get("prompt_eval_duration")
+        eval_ns = info.get("eval_duration")
+        self.records.append(CallRecord(
+            chain=pending["chain"],
+            prompt_chars=len(pending["prompt"]),
+            estimated_prompt_tokens=self.count_tokens(pending["prompt"]),
+            prompt_eval_count=info.get("prompt_eval_count"),
+            eval_count=info.get("eval_count"),
+            prompt_eval_seconds=prompt_eval_ns / 1e9 if prompt_eval_ns else None,
+            eval_seconds=eval_ns / 1e9 if eval_ns else None,
+            wall_seconds=time.perf_counter() - pending["start"],
+        ))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._pending.pop(run_id, None)
+
+    def save(self) -> None:
+        if self.history_path:
+            with open(self.history_path, "w") as f:
+                json.dump([r.model_dump() for r in self.records], f, indent=2)
+
+    # ------------------------------------------------------------------
+    # Estimation
+    # ------------------------------------------------------------------
+
+    def _rates(self, chain: str) -> Dict[str, float]:
+        """Prefill/decode speed, average output length and fixed overhead"""
+        history = [r for r in self.records if r.chain == chain] or self.records
+        if not history:
+            raise ValueError("No call history yet: run a few calls before estimating")
+
+        timed = [r for r in history if r.prompt_eval_seconds and r.eval_seconds]
+        if timed:
+            prefill = sum(r.prompt_eval_count or 0 for r in timed) / sum(r.prompt_eval_seconds for r in timed)
+            decode = sum(r.eval_count or 0 for r in timed) / sum(r.eval_seconds for r in timed)
+            overhead = sum(
+                r.wall_seconds - r.prompt_eval_seconds - r.eval_seconds for r in timed
+            ) / len(timed)
+        else:
+            # No Ollama timings: treat the whole call as decode time
+            prefill = float("inf")
+            wall = sum(r.wall_seconds for r in history)
+            decode = sum(r.eval_count or 0 for r in history) / wall if wall > 0 else 0.0
+            overhead = 0.0
+
+        output_tokens = [r.eval_count for r in history if r.eval_count]
+        return {
+            "prefill_tps": prefill or float("inf"),
+            "decode_tps": decode or 1.0,
+            "overhead_s": max(overhead, 0.0),
+            "output_tokens": sum(output_tokens) / len(output_tokens) if output_tokens else 0,
+        }
+
+    def estimate_batch(
+        self,
+        prompts: List[str],
+        chain: str = "default",
+        num_ctx: Optional[int] = None,
+        num_predict: Optional[int] = None,
+        concurrency: int = 1,
+    ) -> BatchEstimate:
+        """Predict wall time for a batch of rendered prompts.
+
+        Ollama processes requests for one model serially unless
+        OLLAMA_NUM_PARALLEL is raised; pass that value as ``concurrency``.
+        """
+        rates = self._rates(chain)
+        output_tokens = num_predict or round(rates["output_tokens"])
+        prompt_tokens = [self.count_tokens(p) for p in prompts]
+
+        seconds = sum(
+            tokens / rates["prefill_tps"] + output_tokens / rates["decode_tps"] + rates["overhead_s"]
+            for tokens in prompt_tokens
+        )
+        return BatchEstimate(
+            prompts=len(prompts),
+            prompt_tokens=sum(prompt_tokens),
+            expected_output_tokens=output_tokens * len(prompts),
+            estimated_seconds=seconds / max(concurrency, 1),
+            over_context=[
+                i for i, tokens in enumerate(prompt_tokens)
+                if tokens + output_tokens > (num_ctx or self.num_ctx or DEFAULT_NUM_CTX)
+            ],
+        )
+
+
+if __name__ == "__main__":
+    from day3_4_exercise import chain as incident_chain, main_prompt, test_incidents
+    from fewshot_prompting import chain as classify_chain, few_shot_prompt, test_incidents as test_alerts
+
+    accountant = TokenAccountant(history_path="token_history.json")
+    tokenizer = "tiktoken cl100k_base" if _encoding is not None else f"heuristic ({accountant.chars_per_token:.2f} chars/token)"
+    print(f"=== TOKEN ACCOUNTING (tokenizer: {tokenizer}) ===\n")
+
+    # Record a little history for each chain
+    for alert in test_alerts:
+        classify_chain.invoke({"incident": alert}, config={
+            "callbacks": [accountant], "metadata": {"chain": "fewshot_classification"}})
+    for report in test_incidents[:1]:
+        incident_chain.invoke({"incident_text": report}, config={
+            "callbacks": [accountant], "metadata": {"chain": "production_incident"}})
+    accountant.save()
+
+    for record in accountant.records:
+        print(f"  {record.chain:<24} estimated {record.estimated_prompt_tokens:>5} | "
+              f"prompt_eval_count {record.prompt_eval_count} | eval_count {record.eval_count} | "
+              f"{record.wall_seconds:.1f}s")
+    print()
+
+    # Pre-flight estimates for queued batches
+    queued_reports = [main_prompt.format(incident_text=r) for r in test_incidents * 20]
+    queued_alerts = [few_shot_prompt.format(incident=a) for a in test_alerts * 100]
+
+    for chain_name, prompts in [("production_incident", queued_reports),
+                                ("fewshot_classification", queued_alerts)]:
+        estimate = accountant.estimate_batch(prompts, chain=chain_name)
+        print(f"{chain_name}: {estimate.prompts} prompts, {estimate.prompt_tokens:,} prompt tokens, "
+              f"~{estimate.expected_output_tokens:,} output tokens")
+        print(f"   Estimated wall time: {estimate.estimated_seconds / 60:.1f} minutes")
+        if estimate.over_context:
+            print(f"   ⚠️  {len(estimate.over_context)} prompts exceed num_ctx={DEFAULT_NUM_CTX}")
+        print()
+
+    print("="*100 + "\n")
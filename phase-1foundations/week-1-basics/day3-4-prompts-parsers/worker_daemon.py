@@ -0,0 +1,334 @@
+"""
+Day 3-4: Resident Worker Daemon
+Learning: Pay the import/setup cost of langchain, pydantic, parsers and
+chains once in a long-lived process, then serve jobs over a Unix socket
+(or stdin) so each job only pays for the LLM call itself
+
+Usage:
+    python worker_daemon.py serve                 # Unix socket (default path)
+    python worker_daemon.py serve --stdin         # JSON lines on stdin/stdout
+    python worker_daemon.py submit classify_alert '{"text": "CPU at 98% on pay-01"}'
+    python worker_daemon.py run ping              # one-shot, cold process
+    python worker_daemon.py bench [--job ping] [--jobs 20]
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DAY1_DIR = os.path.join(os.path.dirname(HERE), "day1-2-first-chain")
+SOCKET_PATH = os.path.join(tempfile.gettempdir(), "langchain_worker.sock")
+
+# Heavy imports first, then the modules that build parsers, prompts and
+# chains; "module:attribute" also builds a lazily constructed chain
+PRELOAD_MODULES = [
+    "pydantic",
+    "langchain_core.prompts",
+    "langchain_core.output_parsers",
+    "langchain_ollama",
+    "fast_parsers",
+    "day3_4_exercise",
+    "fewshot_prompting:format_chain",
+    "day1_exercise",
+]
+
+_started_at = time.perf_counter()
+_preload_seconds: Dict[str, float] = {}
+
+
+class WorkerError(RuntimeError):
+    """A job failed inside the worker (the message carries the remote error)"""
+
+
+def _add_day1_path() -> None:
+    if DAY1_DIR not in sys.path:
+        sys.path.append(DAY1_DIR)
+
+
+def preload() -> Dict[str, float]:
+    """Import every module jobs need; returns seconds spent per module"""
+    _add_day1_path()
+    for name in PRELOAD_MODULES:
+        if name in _preload_seconds:
+            continue
+        start = time.perf_counter()
+        module_name, _, attribute = name.partition(":")
+        module = importlib.import_module(module_name)
+        if attribute:
+            getattr(module, attribute)
+        _preload_seconds[name] = time.perf_counter() - start
+    return dict(_preload_seconds)
+
+
+# ============================================================================
+# Jobs
+# ============================================================================
+
+JOBS: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def job(name: str):
+    def register(fn: Callable[[Dict[str, Any]], Any]):
+        JOBS[name] = fn
+        return fn
+    return register
+
+
+@job("ping")
+def ping(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """No LLM call: measures pure process/transport overhead"""
+    return {"pid": os.getpid(), "uptime_s": time.perf_counter() - _started_at,
+            "preload_s": sum(_preload_seconds.values())}
+
+
+@job("extract_incident")
+def extract_incident(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    from day3_4_exercise import chain
+    return chain.invoke({"incident_text": inputs["text"]}).model_dump()
+
+
+@job("classify_alert")
+def classify_alert(inputs: Dict[str, Any]) -> str:
+    from fewshot_prompting import format_chain
+    return format_chain.invoke({"input": inputs["text"]}).strip()
+
+
+@job("ask_banking")
+def ask_banking(inputs: Dict[str, Any]) -> str:
+    from day1_exercise import banking_chain
+    # Same default as day1's interactive mode
+    context = inputs.get("context") or "General banking and payments domain"
+    return banking_chain.invoke({"question": inputs["question"], "context": context})
+
+
+def sample_inputs(job_name: str) -> Dict[str, Any]:
+    """Example inputs for each job, taken from the exercises"""
+    _add_day1_path()
+    if job_name == "extract_incident":
+        from day3_4_exercise import test_incidents
+        return {"text": test_incidents[2]}
+    if job_name == "classify_alert":
+        from fewshot_prompting import test_alerts
+        return {"text": test_alerts[0]}
+    if job_name == "ask_banking":
+        from day1_exercise import test_questions
+        return dict(test_questions[0])
+    return {}
+
+
+def handle_request(line: bytes) -> Dict[str, Any]:
+    """One JSON request line -> response dict (errors are returned, not raised)"""
+    start = time.perf_counter()
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        fn = JOBS.get(request.get("job"))
+        if fn is None:
+            raise ValueError(f"Unknown job {request.get('job')!r}; available: {sorted(JOBS)}")
+        result = fn(request.get("input") or {})
+        response = {"id": request_id, "ok": True, "result": result}
+    except Exception as e:
+        response = {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+    response["seconds"] = time.perf_counter() - start
+    return response
+
+
+def _encode(response: Dict[str, Any]) -> bytes:
+    return (json.dumps(response) + "\n").encode()
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    """JSON lines over one connection; a client may send many jobs"""
+
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                self.wfile.write(_encode(handle_request(line)))
+                self.wfile.flush()
+
+
+class _WorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def _exit_on_sigterm(signum, frame) -> None:
+    raise SystemExit(0)
+
+
+def serve_socket(path: str = SOCKET_PATH) -> None:
+    preload()
+    if os.path.exists(path):
+        os.unlink(path)  # stale socket from a previous run
+    # SIGTERM (e.g. Popen.terminate) unwinds through the finally below too
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    with _WorkerServer(path, _JobHandler) as server:
+        print(f"Worker ready on {path} (preload {sum(_preload_seconds.values()):.2f}s, "
+              f"jobs: {', '.join(sorted(JOBS))})", file=sys.stderr, flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def serve_stdin() -> None:
+    """Same protocol on stdin/stdout, for running under a supervisor or pipe"""
+    preload()
+    print(f"Worker ready on stdin (jobs: {', '.join(sorted(JOBS))})", file=sys.stderr, flush=True)
+    for line in sys.stdin.buffer:
+        if line.strip():
+            sys.stdout.buffer.write(_encode(handle_request(line)))
+            sys.stdout.buffer.flush()
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+class WorkerClient:
+    """Thin client keeping one connection to the daemon open"""
+
+    def __init__(self, path: str = SOCKET_PATH, timeout: Optional[float] = 300.0):
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(path)
+        self._file = self._sock.makefile("rwb")
+        self._next_id = 0
+
+    def submit(self, job_name: str, **inputs: Any) -> Any:
+        self._next_id += 1
+        request = {"id": self._next_id, "job": job_name, "input": inputs}
+        self._file.write((json.dumps(request) + "\n").encode())
+        self._file.flush()
+        response = json.loads(self._file.readline())
+        if not response["ok"]:
+            raise WorkerError(response["error"])
+        return response["result"]
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "WorkerClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def wait_for_socket(path: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            WorkerClient(path, timeout=1.0).close()
+            return
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"Worker did not start listening on {path} within {timeout:.0f}s")
+
+
+# ============================================================================
+# Cold start vs warm job
+# ============================================================================
+
+def benchmark(job_name: str = "ping", jobs: int = 20, cold_runs: int = 3) -> Dict[str, float]:
+    """One-shot processes (import + setup + job) vs jobs sent to a warm daemon"""
+    inputs = json.dumps(sample_inputs(job_name))
+
+    cold = []
+    for _ in range(cold_runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, __file__, "run", job_name, inputs],
+                       check=True, stdout=subprocess.DEVNULL, cwd=HERE)
+        cold.append(time.perf_counter() - start)
+
+    path = os.path.join(tempfile.gettempdir(), f"langchain_worker_bench_{os.getpid()}.sock")
+    start = time.perf_counter()
+    daemon = subprocess.Popen([sys.executable, __file__, "serve", "--socket", path],
+                              stderr=subprocess.DEVNULL, cwd=HERE)
+    try:
+        wait_for_socket(path)
+        startup = time.perf_counter() - start
+        warm = []
+        with WorkerClient(path) as client:
+            for _ in range(jobs):
+                start = time.perf_counter()
+                client.submit(job_name, **json.loads(inputs))
+                warm.append(time.perf_counter() - start)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        if os.path.exists(path):  # daemon killed before it could clean up
+            os.unlink(path)
+
+    return {
+        "cold_mean_s": sum(cold) / len(cold),
+        "daemon_startup_s": startup,
+        "warm_mean_s": sum(warm) / len(warm),
+        "warm_first_s": warm[0],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    cli = argparse.ArgumentParser(description="Resident LangChain worker")
+    sub = cli.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="run the daemon")
+    serve.add_argument("--socket", default=SOCKET_PATH)
+    serve.add_argument("--stdin", action="store_true", help="read JSON lines from stdin instead")
+
+    for name, help_text in (("submit", "send one job to a running daemon"),
+                            ("run", "run one job in this (cold) process")):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument("job", choices=sorted(JOBS))
+        command.add_argument("input", nargs="?", default=None, help="job input as JSON (default: sample)")
+        command.add_argument("--socket", default=SOCKET_PATH)
+
+    bench = sub.add_parser("bench", help="cold-start vs warm-job latency")
+    bench.add_argument("--job", default="ping", choices=sorted(JOBS))
+    bench.add_argument("--jobs", type=int, default=20)
+    bench.add_argument("--cold-runs", type=int, default=3)
+
+    args = cli.parse_args(argv)
+    if args.command == "serve":
+        serve_stdin() if args.stdin else serve_socket(args.socket)
+    elif args.command in ("submit", "run"):
+        if args.command == "run":
+            preload()
+        inputs = json.loads(args.input) if args.input else sample_inputs(args.job)
+        if args.command == "submit":
+            with WorkerClient(args.socket) as client:
+                result = client.submit(args.job, **inputs)
+        else:
+            result = JOBS[args.job](inputs)
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"=== WORKER DAEMON: COLD START vs WARM JOB ({args.job}) ===\n")
+        report = benchmark(args.job, args.jobs, args.cold_runs)
+        print(f"One-shot process (cold, avg of {args.cold_runs}): {report['cold_mean_s']:8.3f}s per job")
+        print(f"Daemon startup (one-time):              {report['daemon_startup_s']:8.3f}s")
+        print(f"Warm job via socket (first):            {report['warm_first_s']:8.3f}s")
+        print(f"Warm job via socket (avg of {args.jobs}):        {report['warm_mean_s']:8.3f}s per job")
+        print(f"Saved per job:                          {report['cold_mean_s'] - report['warm_mean_s']:8.3f}s")
+        print("\n" + "="*100 + "\n")
+
+
+if __name__ == "__main__":
+    main()